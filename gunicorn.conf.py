@@ -0,0 +1,36 @@
+"""
+Gunicorn configuration for Mucyo.
+
+The app is loaded once in the master and heavy libraries are preloaded before
+workers fork, so workers boot instantly and share that memory copy-on-write.
+Workers are recycled after a number of requests, or as soon as their memory
+has grown past WORKER_MAX_RSS_MB.
+"""
+
+import os
+
+preload_app = True
+
+# Long enough for the sum of the job stage budgets (settings.JOB_BUDGETS)
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '1200'))
+
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '500'))
+max_requests_jitter = 50
+
+WORKER_MAX_RSS_MB = int(os.environ.get('WORKER_MAX_RSS_MB', '768'))
+
+
+def when_ready(server):
+    """Runs in the master after the app is loaded and before workers are forked."""
+    from translator import startup
+    startup.preload()
+
+
+def post_request(worker, req, environ, resp):
+    """Retire the worker gracefully once its memory has grown too large."""
+    from translator.guardrails import current_rss
+
+    rss_mb = current_rss() / (1024 * 1024)
+    if rss_mb > WORKER_MAX_RSS_MB:
+        worker.log.info("Recycling worker %s: RSS %.0fMB > %dMB", worker.pid, rss_mb, WORKER_MAX_RSS_MB)
+        worker.alive = False
@@ -127,16 +127,20 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+STATIC_MINIFY_PREFIXES = ['translator/']  # only our own assets; admin ships its own
+CRITICAL_CSS_NAME = 'translator/critical.css'  # written into STATIC_ROOT by build_assets
 
 # WhiteNoise configuration for static files (only in production)
+# Build with 'python manage.py build_assets': minified, fingerprinted files with
+# .gz/.br variants, which WhiteNoise serves with immutable cache headers.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+}
 if not DEBUG:
-    STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+    STORAGES['staticfiles'] = {'BACKEND': 'translator.storage.MinifiedStaticFilesStorage'}
 else:
     # In development, use default storage
-    STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'
-
-# Create staticfiles directory if it doesn't exist
-os.makedirs(STATIC_ROOT, exist_ok=True)
+    STORAGES['staticfiles'] = {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}
 
 # Media files (uploads)
 MEDIA_URL = '/media/'
@@ -146,13 +150,87 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 UPLOAD_FOLDER = os.path.join(BASE_DIR, 'uploads')
 TRANSLATIONS_FOLDER = os.path.join(BASE_DIR, 'translations')
 
-# Create directories if they don't exist
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-os.makedirs(TRANSLATIONS_FOLDER, exist_ok=True)
+# Uploads and rendered PDFs go through the 'uploads' and 'translations' storage
+# aliases. 'local' keeps them in the folders above; 's3' puts them in an
+# S3-compatible bucket (AWS S3, or MinIO via AWS_S3_ENDPOINT_URL) so every app
+# node behind the load balancer sees the same files. Credentials come from the
+# usual AWS_ACCESS_KEY_ID / AWS_SECRET_ACCESS_KEY environment variables.
+DOCUMENT_STORAGE = os.environ.get('DOCUMENT_STORAGE', 'local')
+DOCUMENT_URL_EXPIRE = int(os.environ.get('DOCUMENT_URL_EXPIRE', '300'))  # presigned download URL lifetime, seconds
+if DOCUMENT_STORAGE == 's3':
+    _S3_OPTIONS = {
+        'bucket_name': os.environ.get('AWS_STORAGE_BUCKET_NAME', 'mucyo-documents'),
+        'endpoint_url': os.environ.get('AWS_S3_ENDPOINT_URL') or None,  # e.g. http://localhost:9000 for MinIO
+        'region_name': os.environ.get('AWS_S3_REGION_NAME') or None,
+        'addressing_style': os.environ.get('AWS_S3_ADDRESSING_STYLE') or None,  # 'path' for MinIO
+        'default_acl': None,
+        'querystring_expire': DOCUMENT_URL_EXPIRE,
+        'max_memory_size': 1024 * 1024,  # reads beyond this spool to disk, not RAM
+    }
+    STORAGES['uploads'] = {
+        'BACKEND': 'storages.backends.s3.S3Storage',
+        'OPTIONS': {**_S3_OPTIONS, 'location': 'uploads', 'file_overwrite': False},
+    }
+    STORAGES['translations'] = {
+        'BACKEND': 'storages.backends.s3.S3Storage',
+        'OPTIONS': {**_S3_OPTIONS, 'location': 'translations'},
+    }
+elif DOCUMENT_STORAGE == 'local':
+    STORAGES['uploads'] = {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+        'OPTIONS': {'location': UPLOAD_FOLDER},
+    }
+    STORAGES['translations'] = {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+        'OPTIONS': {'location': TRANSLATIONS_FOLDER},
+    }
+else:
+    raise Exception(f"Unknown DOCUMENT_STORAGE '{DOCUMENT_STORAGE}'; use 'local' or 's3'.")
+
+# Working directories are created once at startup by TranslatorConfig.ready()
+
+# Single-flight coordination for identical concurrent jobs (lock + result files)
+SINGLEFLIGHT_FOLDER = os.path.join(BASE_DIR, 'singleflight')
+SINGLEFLIGHT_RESULT_TTL = int(os.environ.get('SINGLEFLIGHT_RESULT_TTL', '120'))  # seconds
+
+# OCR fallback for scanned PDFs (needs pytesseract, pdf2image, tesseract and poppler)
+OCR_ENABLED = os.environ.get('OCR_ENABLED', 'True') == 'True'
+OCR_MAX_WORKERS = int(os.environ.get('OCR_MAX_WORKERS', str(os.cpu_count() or 2)))
+OCR_DPI = int(os.environ.get('OCR_DPI', '300'))
+OCR_CACHE_FOLDER = os.path.join(BASE_DIR, 'ocr_cache')
+OCR_MAX_TASKS_PER_CHILD = 20  # recycle OCR workers to release leaked memory
+OCR_WORKER_BUDGET = {'cpu_seconds': 60, 'memory_mb': 1024}  # per page, enforced with rlimits
+
+# Resource budgets per job stage; exceeding one cancels the job with an error.
+# wall_seconds/cpu_seconds/memory_mb (RSS growth); 'default' applies to every stage.
+JOB_BUDGETS = {
+    'default': {'wall_seconds': 120, 'cpu_seconds': 60, 'memory_mb': 512},
+    'extract': {'wall_seconds': 300},  # includes OCR of scanned pages
+    'translate': {'wall_seconds': 600, 'cpu_seconds': 30},  # mostly waiting on OpenAI
+    'render': {'cpu_seconds': 90},
+}
+# PDF/DOCX extraction and PDF rendering run in spawned workers under rlimits
+# (CPU from the stage budget above; address space per worker process)
+STAGE_WORKERS = int(os.environ.get('STAGE_WORKERS', '1'))  # per stage and gunicorn worker
+STAGE_WORKER_MEMORY_MB = int(os.environ.get('STAGE_WORKER_MEMORY_MB', '1024'))
+STAGE_WORKER_MAX_TASKS_PER_CHILD = 20  # recycle workers to release leaked memory
+GUARDRAILS_SAMPLE_INTERVAL = 0.05  # seconds between RSS samples
+GUARDRAILS_TRACEMALLOC = os.environ.get('GUARDRAILS_TRACEMALLOC', 'False') == 'True'  # slower, finer peaks
+
+# Token/cache counters shared by all workers (see 'manage.py show_metrics')
+METRICS_FILE = os.path.join(BASE_DIR, 'metrics', 'counters.json')
 
 # File upload settings
-FILE_UPLOAD_MAX_MEMORY_SIZE = 16 * 1024 * 1024  # 16MB
-DATA_UPLOAD_MAX_MEMORY_SIZE = 16 * 1024 * 1024  # 16MB
+# Uploads are sniffed, size-checked and hashed as they stream in, and anything
+# above FILE_UPLOAD_MAX_MEMORY_SIZE spills to a temporary file on disk.
+MAX_UPLOAD_SIZE = 16 * 1024 * 1024  # 16MB
+FILE_UPLOAD_HANDLERS = [
+    'translator.uploadhandlers.StreamingValidationUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+FILE_UPLOAD_MAX_MEMORY_SIZE = 256 * 1024  # 256KB
+DATA_UPLOAD_MAX_MEMORY_SIZE = 1024 * 1024  # 1MB, form fields only
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -162,3 +240,27 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # OpenAI API Key
 OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY', '')
 
+# PDF output (see translator/pdfwriter.py). Arabic needs a TrueType font with
+# Arabic glyphs; the first one found is used and only its used glyphs embedded.
+PDF_ARABIC_FONTS = [path for path in [
+    os.environ.get('PDF_ARABIC_FONT', ''),
+    'arial.ttf',
+    'C:/Windows/Fonts/arial.ttf',
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+] if path]
+PDF_COMPRESSION_LEVEL = 9  # zlib level for page content streams
+
+# OpenAI request timeouts and hedging (see translator/hedging.py). Each upload
+# must finish its OpenAI calls within JOB_DEADLINE_SECONDS; keep it below the
+# translate stage budget and gunicorn's timeout. With OPENAI_HEDGING on, a
+# translation call still running past the OPENAI_HEDGE_PERCENTILE of recent
+# latencies gets a duplicate request and the first answer wins.
+JOB_DEADLINE_SECONDS = int(os.environ.get('JOB_DEADLINE_SECONDS', '540'))
+OPENAI_REQUEST_TIMEOUT = int(os.environ.get('OPENAI_REQUEST_TIMEOUT', '300'))  # seconds, per call
+OPENAI_STREAM_IDLE_TIMEOUT = 60  # seconds without a streamed token before a call counts as stalled
+OPENAI_HEDGING = os.environ.get('OPENAI_HEDGING', 'False') == 'True'
+OPENAI_HEDGE_PERCENTILE = int(os.environ.get('OPENAI_HEDGE_PERCENTILE', '95'))
+OPENAI_HEDGE_MIN_SAMPLES = 20  # calls seen by a worker before its own percentile is trusted
+OPENAI_HEDGE_DEFAULT_DELAY = 15  # seconds per 1000 characters until then
+OPENAI_HEDGE_THREADS = 8  # request threads per worker for hedged calls
+
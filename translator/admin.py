@@ -0,0 +1,22 @@
+from django.contrib import admin
+
+from .models import Course, DocumentRevision, GlossaryTerm
+
+
+@admin.register(Course)
+class CourseAdmin(admin.ModelAdmin):
+    search_fields = ['name']
+
+
+@admin.register(GlossaryTerm)
+class GlossaryTermAdmin(admin.ModelAdmin):
+    list_display = ['term', 'translation', 'course', 'source_language', 'target_language']
+    list_filter = ['course', 'source_language', 'target_language']
+    list_select_related = ['course']
+    search_fields = ['term', 'translation']
+
+
+@admin.register(DocumentRevision)
+class DocumentRevisionAdmin(admin.ModelAdmin):
+    list_display = ['document_id', 'revision', 'source_language', 'target_language', 'created_at']
+    search_fields = ['document_id']
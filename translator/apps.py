@@ -5,4 +5,8 @@ class TranslatorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'translator'
 
+    def ready(self):
+        from . import startup
+        startup.ensure_directories()
+
 
@@ -0,0 +1,131 @@
+"""
+Static asset helpers used by the build_assets command and the static storage.
+
+Minification uses rcssmin/rjsmin (pure Python, no Node toolchain). Critical
+CSS is extracted by keeping only the rules whose selectors refer to classes,
+ids and elements present in the above-the-fold markup of a template.
+"""
+
+import gzip
+import re
+
+# Classes/ids referenced in markup, e.g. class="nav-link active" id="navbar"
+CLASS_ATTR_RE = re.compile(r'class="([^"{]*)')
+ID_ATTR_RE = re.compile(r'id="([^"{]*)"')
+TAG_RE = re.compile(r'<([a-zA-Z][a-zA-Z0-9]*)')
+
+# Parts of a selector that must exist in the markup for a rule to apply
+SELECTOR_CLASS_RE = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+SELECTOR_ID_RE = re.compile(r'#(-?[_a-zA-Z][\w-]*)')
+SELECTOR_TAG_RE = re.compile(r'(?:^|[\s>+~(,])([a-zA-Z][a-zA-Z0-9]*)(?=[.#:\[\s>+~),]|$)')
+ANIMATION_RE = re.compile(r'animation(?:-name)?:([^;}]*)')
+
+
+def minify_css(text):
+    """Return minified CSS."""
+    import rcssmin
+    return rcssmin.cssmin(text)
+
+
+def minify_js(text):
+    """Return minified JavaScript."""
+    import rjsmin
+    return rjsmin.jsmin(text)
+
+
+def compressed_sizes(data):
+    """Return (raw, gzip, brotli) sizes in bytes; brotli is None if unavailable."""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    try:
+        import brotli
+        brotli_size = len(brotli.compress(data))
+    except ImportError:
+        brotli_size = None
+    return len(data), len(gzip.compress(data, compresslevel=9)), brotli_size
+
+
+def split_rules(css):
+    """Split a CSS string into top-level (prelude, body) pairs."""
+    rules = []
+    depth = 0
+    quote = None
+    start = 0
+    prelude = None
+    for i, char in enumerate(css):
+        if quote:
+            if char == quote and css[i - 1] != '\\':
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char == '{':
+            if depth == 0:
+                prelude = css[start:i].strip()
+                start = i + 1
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                rules.append((prelude, css[start:i]))
+                start = i + 1
+        elif char == ';' and depth == 0:
+            # Statement at-rules such as @import or @charset
+            rules.append((css[start:i].strip(), None))
+            start = i + 1
+    return rules
+
+
+def markup_tokens(html):
+    """Collect the classes, ids and element names used in a chunk of markup."""
+    classes = {name for value in CLASS_ATTR_RE.findall(html) for name in value.split()}
+    ids = set(ID_ATTR_RE.findall(html))
+    tags = {tag.lower() for tag in TAG_RE.findall(html)} | {'html', 'body', 'head'}
+    return classes, ids, tags
+
+
+def _selector_matches(selector, classes, ids, tags):
+    # Ignore pseudo-elements and pseudo-classes such as ::before or :hover
+    base = re.sub(r'::?[\w-]+(\([^)]*\))?', '', selector)
+    if not all(name in classes for name in SELECTOR_CLASS_RE.findall(base)):
+        return False
+    if not all(name in ids for name in SELECTOR_ID_RE.findall(base)):
+        return False
+    stripped = SELECTOR_CLASS_RE.sub('', SELECTOR_ID_RE.sub('', base))
+    return all(tag.lower() in tags for tag in SELECTOR_TAG_RE.findall(stripped))
+
+
+def _critical_rules(css, tokens):
+    kept = []
+    animations = set()
+    for prelude, body in split_rules(css):
+        if body is None:
+            if prelude.startswith('@charset'):
+                kept.append(f"{prelude};")
+            continue
+        if prelude.startswith('@media') or prelude.startswith('@supports'):
+            inner, inner_animations = _critical_rules(body, tokens)
+            if inner:
+                kept.append(f"{prelude}{{{inner}}}")
+                animations |= inner_animations
+        elif prelude.startswith('@font-face'):
+            kept.append(f"{prelude}{{{body}}}")
+        elif prelude.startswith('@'):
+            continue
+        else:
+            selectors = [s for s in prelude.split(',') if _selector_matches(s.strip(), *tokens)]
+            if selectors:
+                kept.append(f"{','.join(selectors)}{{{body}}}")
+                for value in ANIMATION_RE.findall(body):
+                    animations.update(re.findall(r'[\w-]+', value))
+    return ''.join(kept), animations
+
+
+def extract_critical_css(css, html):
+    """Return the subset of css needed to render the given markup, plus referenced keyframes."""
+    tokens = markup_tokens(html)
+    critical, animations = _critical_rules(css, tokens)
+    keyframes = [
+        f"{prelude}{{{body}}}" for prelude, body in split_rules(css)
+        if body is not None and prelude.startswith('@keyframes') and prelude.split()[-1] in animations
+    ]
+    return critical + ''.join(keyframes)
@@ -0,0 +1,39 @@
+"""
+Text extraction from uploaded PDF and DOCX files.
+
+These functions run inside the extract stage's worker processes (see
+guardrails.run_isolated), so they only use the parsing libraries and must not
+touch Django models. OCR of scanned pages is dispatched by the caller.
+"""
+
+from . import ocr
+
+
+def read_pdf_pages(file_path):
+    """
+    Return (page_texts, scanned_pages) for a PDF.
+
+    scanned_pages lists (index, page_hash) for pages without a text layer,
+    ready for ocr.ocr_pages().
+    """
+    import PyPDF2
+
+    page_texts = []
+    scanned_pages = []
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        for index, page in enumerate(pdf_reader.pages):
+            page_text = page.extract_text() or ""
+            page_texts.append(page_text)
+            if not page_text.strip():
+                scanned_pages.append((index, ocr.page_hash(page)))
+    return page_texts, scanned_pages
+
+
+def read_docx_text(file_path):
+    """Return the text of a DOCX file with a blank line between paragraphs."""
+    from docx import Document
+
+    doc = Document(file_path)
+    # Blank lines mark real paragraph boundaries (see revisions.split_paragraphs)
+    return "\n\n".join([paragraph.text for paragraph in doc.paragraphs])
@@ -0,0 +1,90 @@
+"""
+Storage for uploaded documents and rendered PDFs.
+
+Both go through Django's storage API (the 'uploads' and 'translations' aliases
+in STORAGES), so every app node behind the load balancer sees the same files.
+Locally they are plain folders; in production they can live in an
+S3-compatible bucket, in which case downloads are handed to the browser as
+short-lived presigned URLs instead of being streamed through a worker.
+"""
+
+import os
+import shutil
+import tempfile
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.files.storage import storages
+from django.http import FileResponse, HttpResponseRedirect
+from django.utils.text import get_valid_filename
+from django.utils.http import content_disposition_header
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def uploads_storage():
+    return storages['uploads']
+
+
+def translations_storage():
+    return storages['translations']
+
+
+def unique_upload_name(filename):
+    """
+    Return a storage name for an upload that no other upload can share.
+
+    Several students often upload a handout with the same file name at the
+    same moment. Each request extracts, translates and then deletes its own
+    upload, so a shared name would let one request read or delete another's
+    file; a random per-upload prefix keeps them apart. The name is sanitised
+    as well, and the storage API refuses names that escape its root.
+    """
+    return f"{uuid.uuid4().hex}_{get_valid_filename(filename)}"
+
+
+def is_local(storage):
+    """Return True if the storage keeps its files on this node's disk."""
+    try:
+        storage.path('')
+    except NotImplementedError:
+        return False
+    return True
+
+
+@contextmanager
+def local_path(storage, name):
+    """
+    Yield a filesystem path for a stored file.
+
+    PyPDF2 and the OCR tools need a real file. Local storage hands out its own
+    path; remote objects are streamed to a temporary file that is removed again
+    when the block exits.
+    """
+    if is_local(storage):
+        yield storage.path(name)
+        return
+
+    fd, tmp_path = tempfile.mkstemp(suffix=os.path.splitext(name)[1])
+    try:
+        with os.fdopen(fd, 'wb') as destination, storage.open(name, 'rb') as source:
+            shutil.copyfileobj(source, destination, COPY_CHUNK_SIZE)
+        yield tmp_path
+    finally:
+        os.remove(tmp_path)
+
+
+def download_response(storage, name, filename):
+    """Return a response that downloads the stored file under the given filename."""
+    if is_local(storage):
+        # FileResponse streams the file in blocks rather than reading it whole
+        return FileResponse(storage.open(name, 'rb'), as_attachment=True, filename=filename)
+
+    # Remote storage: the browser fetches the object directly from the bucket
+    url = storage.url(
+        name,
+        parameters={'ResponseContentDisposition': content_disposition_header(True, filename)},
+        expire=settings.DOCUMENT_URL_EXPIRE,
+    )
+    return HttpResponseRedirect(url)
@@ -0,0 +1,111 @@
+"""
+Course glossaries injected into translation prompts.
+
+A course glossary can hold tens of thousands of terms, far too many to paste
+into every prompt. Each glossary is compiled once into an Aho-Corasick
+automaton (cached per process and rebuilt only when the terms change), which
+finds every term occurring in a chunk in a single linear pass. Only those
+terms are added to that chunk's prompt.
+"""
+
+from collections import deque
+
+from django.db.models import Count, Max
+
+from .models import GlossaryTerm
+
+# Compiled automatons keyed by (course_id, source_language, target_language)
+_cache = {}
+
+
+class Automaton:
+    """Aho-Corasick automaton for case-insensitive whole-word term matching."""
+
+    def __init__(self, terms):
+        # terms maps the original term to its required translation
+        self.translations = {}
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+        for term, translation in terms.items():
+            key = term.strip().lower()
+            if not key:
+                continue
+            self.translations[key] = (term.strip(), translation)
+            self._add(key)
+        self._build_fail_links()
+
+    def _add(self, key):
+        state = 0
+        for char in key:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            state = next_state
+        self.output[state].append(key)
+
+    def _build_fail_links(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def find(self, text):
+        """Return [(term, translation)] for terms occurring in text, in order of first occurrence."""
+        lowered = text.lower()
+        found = {}
+        state = 0
+        for end, char in enumerate(lowered):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for key in self.output[state]:
+                if key in found:
+                    continue
+                start = end - len(key) + 1
+                # Only whole words: "cell" must not match inside "cellular"
+                if start > 0 and lowered[start - 1].isalnum():
+                    continue
+                if end + 1 < len(lowered) and lowered[end + 1].isalnum():
+                    continue
+                found[key] = self.translations[key]
+        return list(found.values())
+
+    def __len__(self):
+        return len(self.translations)
+
+
+def get_automaton(course_id, source_language, target_language):
+    """Return the compiled glossary for a course and language pair, or None if it is empty."""
+    if not course_id:
+        return None
+
+    terms = GlossaryTerm.objects.filter(
+        course_id=course_id,
+        source_language=source_language,
+        target_language=target_language,
+    )
+    version = terms.aggregate(count=Count('id'), updated=Max('updated_at'))
+    if not version['count']:
+        return None
+
+    cache_key = (course_id, source_language, target_language)
+    cached = _cache.get(cache_key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    automaton = Automaton(dict(terms.values_list('term', 'translation')))
+    _cache[cache_key] = (version, automaton)
+    print(f"DEBUG: Compiled glossary for course {course_id} with {len(automaton)} terms")
+    return automaton
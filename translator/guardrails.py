@@ -0,0 +1,345 @@
+"""
+Per-stage resource budgets for translation jobs.
+
+Each stage of a job (extract, translate, render) runs inside stage(), which
+enforces the wall-clock, CPU and memory budget configured in JOB_BUDGETS:
+
+- wall-clock and CPU budgets use interval timers (ITIMER_REAL / ITIMER_PROF)
+  whose signals raise BudgetExceeded in the running code;
+- memory is sampled from RSS by a background thread, which signals the main
+  thread when the stage grows past its budget; with GUARDRAILS_TRACEMALLOC
+  the Python-level allocation peak is traced as well.
+
+Signals can only be handled on the main thread (gunicorn sync workers). On
+other threads, or on platforms without these signals, budgets are checked when
+the stage finishes instead. Peak usage of every stage is recorded in metrics
+so instances can be sized from real numbers.
+
+Signal handlers only run between Python bytecodes, so they cannot stop a long
+call inside PyPDF2 or ReportLab, and a runaway parse would grow the web
+worker itself. run_isolated() therefore runs such calls in a worker process
+under rlimits, which the kernel enforces whatever the code is doing. Workers
+are forked from a fork server that has already imported the document
+libraries, so a new worker starts without re-importing them.
+"""
+
+import multiprocessing
+import os
+import signal
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from . import metrics
+
+try:
+    import resource
+except ImportError:
+    # Windows development machines: no rlimits or CPU accounting
+    resource = None
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+_local = threading.local()
+_pools = {}
+_mp_context = None
+
+
+class BudgetExceeded(Exception):
+    """A job stage ran past one of its resource budgets."""
+
+
+def current_rss():
+    """Return the resident set size of this process in bytes, or 0 if unknown."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _reset_peak_rss():
+    """Reset this process's peak RSS (Linux), so a pool task measures only its own peak."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def _peak_rss():
+    """Return the peak resident set size of this process in bytes, or 0 if unknown."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _cpu_time():
+    if resource is None:
+        return time.process_time()
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _budget(stage_name):
+    budgets = settings.JOB_BUDGETS
+    return {**budgets.get('default', {}), **budgets.get(stage_name, {})}
+
+
+class _MemorySampler(threading.Thread):
+    """Track peak RSS growth and interrupt the main thread past the budget."""
+
+    def __init__(self, state, limit_bytes, interval, notify_main):
+        super().__init__(daemon=True)
+        self.state = state
+        self.limit_bytes = limit_bytes
+        self.interval = interval
+        self.notify_main = notify_main
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            growth = current_rss() - self.state['rss_start']
+            self.state['rss_peak'] = max(self.state['rss_peak'], growth)
+            if self.limit_bytes and growth > self.limit_bytes and not self.state['reason']:
+                self.state['reason'] = 'memory'
+                if self.notify_main:
+                    signal.pthread_kill(threading.main_thread().ident, signal.SIGALRM)
+                return
+
+
+@contextmanager
+def stage(name):
+    """Run a block of a job under the budgets configured for the named stage."""
+    if getattr(_local, 'active', None):
+        # Nested stages run under the outer stage's budget
+        yield
+        return
+
+    budget = _budget(name)
+    wall_budget = budget.get('wall_seconds')
+    cpu_budget = budget.get('cpu_seconds')
+    memory_budget = budget.get('memory_mb')
+
+    state = {'reason': None, 'rss_start': current_rss(), 'rss_peak': 0}
+    use_signals = (
+        threading.current_thread() is threading.main_thread()
+        and hasattr(signal, 'setitimer')
+    )
+
+    def on_signal(signum, frame):
+        if state.get('finishing'):
+            # Late signals are caught by the checks after the stage instead
+            return
+        if state['reason'] is None:
+            state['reason'] = 'cpu' if signum == signal.SIGPROF else 'wall-clock'
+        raise BudgetExceeded(_message(name, state['reason'], budget))
+
+    previous_handlers = {}
+    if use_signals:
+        previous_handlers[signal.SIGALRM] = signal.signal(signal.SIGALRM, on_signal)
+        if wall_budget:
+            signal.setitimer(signal.ITIMER_REAL, wall_budget)
+        if cpu_budget:
+            previous_handlers[signal.SIGPROF] = signal.signal(signal.SIGPROF, on_signal)
+            signal.setitimer(signal.ITIMER_PROF, cpu_budget)
+
+    sampler = _MemorySampler(
+        state, (memory_budget or 0) * 1024 * 1024, settings.GUARDRAILS_SAMPLE_INTERVAL, use_signals
+    )
+    sampler.start()
+
+    trace = settings.GUARDRAILS_TRACEMALLOC and not tracemalloc.is_tracing()
+    if trace:
+        tracemalloc.start()
+
+    _local.active = name
+    # Usage of work handed to pool workers by run_isolated() within this stage
+    _local.worker_usage = worker_usage = {'cpu': 0.0, 'rss_peak': 0}
+    wall_start = time.monotonic()
+    cpu_start = _cpu_time()
+    try:
+        yield
+    finally:
+        # Stop the sampler before restoring the handlers: its SIGALRM would
+        # otherwise hit the default handler and kill the worker
+        state['finishing'] = True
+        sampler.stopped.set()
+        sampler.join()
+        if use_signals:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+        _local.active = None
+        _local.worker_usage = None
+
+        wall = time.monotonic() - wall_start
+        cpu = _cpu_time() - cpu_start + worker_usage['cpu']
+        rss_peak = max(state['rss_peak'], current_rss() - state['rss_start'], worker_usage['rss_peak'])
+        traced_peak = None
+        if trace:
+            traced_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        _record(name, wall, cpu, rss_peak, traced_peak)
+
+    # Budgets are also checked afterwards, for threads and platforms without signals
+    if wall_budget and wall > wall_budget:
+        state['reason'] = state['reason'] or 'wall-clock'
+    if cpu_budget and cpu > cpu_budget:
+        state['reason'] = state['reason'] or 'cpu'
+    if memory_budget and rss_peak > memory_budget * 1024 * 1024:
+        state['reason'] = state['reason'] or 'memory'
+    if state['reason']:
+        raise BudgetExceeded(_message(name, state['reason'], budget))
+
+
+def _message(stage_name, reason, budget):
+    limits = {
+        'wall-clock': f"{budget.get('wall_seconds')}s",
+        'cpu': f"{budget.get('cpu_seconds')}s of CPU",
+        'memory': f"{budget.get('memory_mb')}MB of memory",
+    }
+    return (f"The document is too large or complex to process: the {stage_name} step "
+            f"exceeded its {reason} budget ({limits[reason]}).")
+
+
+def _record(stage_name, wall, cpu, rss_peak, traced_peak):
+    rss_mb = rss_peak / (1024 * 1024)
+    print(f"DEBUG: Stage {stage_name}: {wall:.2f}s wall, {cpu:.2f}s CPU, +{rss_mb:.1f}MB RSS peak")
+    metrics.observe(f"stage.{stage_name}.wall_seconds", round(wall, 3))
+    metrics.observe(f"stage.{stage_name}.cpu_seconds", round(cpu, 3))
+    metrics.observe(f"stage.{stage_name}.rss_peak_mb", round(rss_mb, 1))
+    if traced_peak is not None:
+        metrics.observe(f"stage.{stage_name}.traced_peak_mb", round(traced_peak / (1024 * 1024), 1))
+
+
+def limit_pool_worker(cpu_seconds=None, memory_mb=None):
+    """
+    Apply rlimits to the current (pool worker) process.
+
+    The CPU limit is relative to the CPU the process has already used, so it
+    can be re-applied before every task. Child processes such as tesseract
+    inherit both limits.
+    """
+    if resource is None:
+        return
+    if memory_mb:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if cpu_seconds:
+        limit = int(_cpu_time()) + int(cpu_seconds) + 1
+        resource.setrlimit(resource.RLIMIT_CPU, (limit, resource.RLIM_INFINITY))
+
+
+def _get_mp_context():
+    """
+    Return the forkserver context for stage pools, preloading the document libraries.
+
+    The fork server is started by the first pool of each gunicorn worker. It
+    cannot be started in the master, because a process can only check on a
+    fork server it started itself.
+    """
+    global _mp_context
+    if _mp_context is None:
+        from .startup import WORKER_MODULES
+
+        _mp_context = multiprocessing.get_context('forkserver')
+        _mp_context.set_forkserver_preload(WORKER_MODULES)
+    return _mp_context
+
+
+def _get_pool(stage_name):
+    """
+    Create the worker pool for a stage on first use (never in the gunicorn master).
+
+    The address-space limit cannot be raised again once set, so every stage
+    gets its own pool; workers are replaced after STAGE_WORKER_MAX_TASKS_PER_CHILD
+    tasks so leaked memory is returned.
+    """
+    if stage_name not in _pools:
+        _pools[stage_name] = ProcessPoolExecutor(
+            max_workers=settings.STAGE_WORKERS,
+            mp_context=_get_mp_context(),
+            max_tasks_per_child=settings.STAGE_WORKER_MAX_TASKS_PER_CHILD,
+            initializer=limit_pool_worker,
+            initargs=(None, settings.STAGE_WORKER_MEMORY_MB),
+        )
+    return _pools[stage_name]
+
+
+def _discard_pool(stage_name):
+    """Kill a stage's workers, e.g. after a task was cancelled or a worker died."""
+    pool = _pools.pop(stage_name, None)
+    if pool is None:
+        return
+    # Running tasks cannot be cancelled, so stop their processes directly
+    for process in list((pool._processes or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_limited(cpu_seconds, fn, args):
+    """
+    Apply the task's CPU limit and call fn. Runs inside a pool worker.
+
+    Returns fn's result with the CPU time and peak RSS growth of the task, so
+    the calling stage can record and check them.
+    """
+    limit_pool_worker(cpu_seconds=cpu_seconds)
+    rss_start = current_rss()
+    _reset_peak_rss()
+    cpu_start = _cpu_time()
+    result = fn(*args)
+    usage = {'cpu': _cpu_time() - cpu_start, 'rss_peak': max(0, _peak_rss() - rss_start)}
+    return result, usage
+
+
+def run_isolated(stage_name, fn, *args):
+    """
+    Call fn(*args) in a worker process under the named stage's CPU budget.
+
+    Inside stage(), the worker's CPU time and peak RSS growth count towards
+    the stage's recorded usage and budgets.
+
+    fn must be a module-level function that does not need Django's app
+    registry, and its arguments and result must be picklable. A worker killed
+    by its CPU or memory limit, or a call that outlives the stage's wall-clock
+    budget, raises BudgetExceeded.
+    """
+    budget = _budget(stage_name)
+    future = _get_pool(stage_name).submit(_run_limited, budget.get('cpu_seconds'), fn, args)
+    try:
+        result, usage = future.result(timeout=budget.get('wall_seconds'))
+    except FutureTimeoutError:
+        _discard_pool(stage_name)
+        raise BudgetExceeded(_message(stage_name, 'wall-clock', budget))
+    except (BrokenProcessPool, MemoryError):
+        _discard_pool(stage_name)
+        raise BudgetExceeded(
+            f"The document is too large or complex to process: the {stage_name} step "
+            f"exceeded its CPU or memory budget and was stopped."
+        )
+    except BudgetExceeded:
+        # The enclosing stage() ran out of time while the worker was busy
+        _discard_pool(stage_name)
+        raise
+
+    worker_usage = getattr(_local, 'worker_usage', None)
+    if worker_usage is not None:
+        worker_usage['cpu'] += usage['cpu']
+        worker_usage['rss_peak'] = max(worker_usage['rss_peak'], usage['rss_peak'])
+    return result
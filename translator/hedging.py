@@ -0,0 +1,210 @@
+"""
+Deadline-aware, optionally hedged OpenAI requests.
+
+Every call is bounded by the job's deadline: its timeout is the time the job
+has left, and a job that has run out of time fails with BudgetExceeded instead
+of waiting on OpenAI. With OPENAI_HEDGING enabled, a call that is still
+running once it passes the OPENAI_HEDGE_PERCENTILE of recent latencies gets a
+duplicate request. The first response wins and the other request is
+cancelled by closing its stream. Hedges and the tokens spent on cancelled
+requests are counted in metrics so the percentile can be tuned against cost.
+
+Latencies are kept per worker process and normalised per 1000 characters of
+input, because a batch of 8000 characters is expected to take longer than a
+single heading.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+
+from . import guardrails, metrics
+
+# Recent call latencies in seconds per 1000 input characters
+LATENCY_WINDOW = 200
+
+_latencies = deque(maxlen=LATENCY_WINDOW)
+_latencies_lock = threading.Lock()
+_executor = None
+
+
+class Result:
+    """Text and token usage of a finished completion."""
+
+    def __init__(self, text, usage):
+        self.text = text
+        self.usage = usage
+
+
+class _Attempt:
+    """One request of a possibly hedged call; cancelled via its event and stream."""
+
+    def __init__(self):
+        self.cancelled = threading.Event()
+        self.stream = None
+        self.chunks = 0
+        self.started = time.monotonic()
+
+    def cancel(self):
+        self.cancelled.set()
+        # A stalled stream never reaches the next chunk to see the event, so
+        # close its connection from the waiting thread as well
+        stream = self.stream
+        if stream is not None:
+            try:
+                stream.close()
+            except Exception as e:
+                print(f"DEBUG: Closing a cancelled OpenAI stream failed: {str(e)}")
+
+
+def _get_executor():
+    """Create the request threads on first use (never in the gunicorn master)."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.OPENAI_HEDGE_THREADS, thread_name_prefix='openai-hedge'
+        )
+    return _executor
+
+
+def time_left(deadline):
+    """Return the seconds left before deadline (None for no deadline), or raise BudgetExceeded."""
+    if deadline is None:
+        return None
+    left = deadline - time.monotonic()
+    if left <= 0:
+        raise guardrails.BudgetExceeded(
+            "The document took too long to translate and was stopped. Please try again or upload a shorter document."
+        )
+    return left
+
+
+def _no_retries(client):
+    """
+    The client retries failed requests on its own by default, each with a
+    fresh timeout, which would run a call well past the job deadline.
+    """
+    return client.with_options(max_retries=0)
+
+
+def _request_timeout(deadline):
+    left = time_left(deadline)
+    return settings.OPENAI_REQUEST_TIMEOUT if left is None else min(settings.OPENAI_REQUEST_TIMEOUT, left)
+
+
+def record_latency(seconds, chars):
+    with _latencies_lock:
+        _latencies.append(seconds / max(1.0, chars / 1000))
+    metrics.observe('openai.latency_seconds', round(seconds, 3))
+
+
+def hedge_delay(chars):
+    """Seconds to wait for a request of this size before sending a duplicate."""
+    with _latencies_lock:
+        samples = sorted(_latencies)
+    if len(samples) < settings.OPENAI_HEDGE_MIN_SAMPLES:
+        per_thousand = settings.OPENAI_HEDGE_DEFAULT_DELAY
+    else:
+        rank = int(len(samples) * settings.OPENAI_HEDGE_PERCENTILE / 100)
+        per_thousand = samples[min(rank, len(samples) - 1)]
+    return per_thousand * max(1.0, chars / 1000)
+
+
+def _stream(client, request, timeout, attempt):
+    """Run one streamed request; returns a Result, or None once cancelled."""
+    from openai import Timeout
+
+    # A stream that stops producing tokens for the idle timeout counts as stalled
+    stream_timeout = Timeout(timeout, read=min(timeout, settings.OPENAI_STREAM_IDLE_TIMEOUT))
+    stream = _no_retries(client).chat.completions.create(
+        **request, stream=True, stream_options={'include_usage': True}, timeout=stream_timeout
+    )
+    attempt.stream = stream
+    parts = []
+    usage = None
+    try:
+        for chunk in stream:
+            if attempt.cancelled.is_set():
+                return None
+            attempt.chunks += 1
+            if chunk.usage is not None:
+                usage = chunk.usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+    finally:
+        # Closing the connection is what stops OpenAI generating for a loser
+        stream.close()
+    return Result(''.join(parts), usage)
+
+
+def complete(client, request, chars, deadline=None, hedge=None, record=True):
+    """
+    Run a chat completion request (keyword arguments for create()) and return a Result.
+
+    chars is the size of the input, used to scale the hedge delay; deadline is
+    a time.monotonic() timestamp the whole job must finish by. Pass
+    record=False for calls to other models (e.g. language detection), so their
+    latency does not skew the hedge delay of translation calls.
+    """
+    if hedge is None:
+        hedge = settings.OPENAI_HEDGING
+    metrics.increment('openai.requests')
+
+    if not hedge:
+        started = time.monotonic()
+        response = _no_retries(client).chat.completions.create(**request, timeout=_request_timeout(deadline))
+        if record:
+            record_latency(time.monotonic() - started, chars)
+        return Result(response.choices[0].message.content, getattr(response, 'usage', None))
+
+    executor = _get_executor()
+    attempts = {}
+    primary = _Attempt()
+    attempts[executor.submit(_stream, client, request, _request_timeout(deadline), primary)] = primary
+    try:
+        delay = hedge_delay(chars)
+        left = time_left(deadline)
+        # A hedge sent when the job is about to run out of time only wastes tokens
+        may_hedge = left is None or delay < left
+        done, pending = wait(attempts, timeout=delay if may_hedge else left)
+
+        if not done and may_hedge:
+            print(f"DEBUG: OpenAI request still running after {delay:.1f}s, sending a hedge")
+            metrics.increment('openai.hedges')
+            backup = _Attempt()
+            attempts[executor.submit(_stream, client, request, _request_timeout(deadline), backup)] = backup
+            pending = set(attempts)
+
+        # First successful response wins; a failed request leaves the other one running
+        error = None
+        while True:
+            for future in done:
+                if future.exception() is None:
+                    return _finish(future.result(), attempts[future], attempts, chars)
+                error = future.exception()
+            if not pending:
+                raise error
+            done, pending = wait(pending, timeout=time_left(deadline), return_when=FIRST_COMPLETED)
+            if not done:
+                time_left(deadline)
+    finally:
+        for attempt in attempts.values():
+            attempt.cancel()
+
+
+def _finish(result, winner, attempts, chars):
+    record_latency(time.monotonic() - winner.started, chars)
+    if len(attempts) > 1:
+        losers = [attempt for attempt in attempts.values() if attempt is not winner]
+        if winner is not next(iter(attempts.values())):
+            metrics.increment('openai.hedge_wins')
+        # Each loser was billed for the prompt plus whatever it streamed before being cancelled
+        prompt_tokens = getattr(result.usage, 'prompt_tokens', 0) or 0
+        wasted = sum(prompt_tokens + attempt.chunks for attempt in losers)
+        metrics.increment('openai.wasted_tokens', wasted)
+        print(f"DEBUG: Hedged request finished, about {wasted} tokens spent on cancelled requests")
+    return result
+
@@ -0,0 +1,82 @@
+"""
+Benchmark Arabic shaping against total PDF render time.
+
+Builds a synthetic Arabic document with recurring header/footer lines and
+reports how long shaping takes uncached, through the shaping cache, and as a
+share of a full PDF render. Shaping goes through rtl.shape_line paragraph by
+paragraph, the way PageStreamWriter calls it, and the render runs in this
+process so no worker start-up is timed. Usage: python manage.py bench_rtl --pages 100
+"""
+
+import os
+import random
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+
+from translator import pdfwriter, rtl
+
+WORDS = [
+    'الطالب', 'المدرسة', 'الدرس', 'الكتاب', 'المعلم', 'العلوم', 'الرياضيات', 'التاريخ',
+    'الجامعة', 'البحث', 'النتائج', 'التجربة', 'الفصل', 'السؤال', 'الإجابة', 'المعرفة',
+]
+RECURRING_LINES = ['مقدمة في علم الأحياء - الوحدة الثالثة', 'ملاحظات المحاضرة', 'أسئلة المراجعة']
+LINES_PER_PAGE = 40
+
+
+def build_document(pages, seed=0):
+    """Return synthetic Arabic text of roughly the given number of pages."""
+    rng = random.Random(seed)
+    lines = []
+    for page in range(pages):
+        lines.append(RECURRING_LINES[0])
+        for _ in range(LINES_PER_PAGE - 2):
+            lines.append(' '.join(rng.choice(WORDS) for _ in range(12)))
+        lines.append(rng.choice(RECURRING_LINES[1:]))
+    return '\n'.join(lines)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark RTL shaping and its share of Arabic PDF render time.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=100, help='Synthetic document length in pages')
+
+    def handle(self, *args, **options):
+        from arabic_reshaper import reshape
+        from bidi.algorithm import get_display
+
+        text = build_document(options['pages'])
+        paragraphs = text.split('\n')
+
+        start = time.perf_counter()
+        for paragraph in paragraphs:
+            get_display(reshape(paragraph))
+        uncached = time.perf_counter() - start
+
+        rtl.shape_line.cache_clear()
+        rtl._reshape_word.cache_clear()
+        start = time.perf_counter()
+        for paragraph in paragraphs:
+            rtl.shape_line(paragraph)
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for paragraph in paragraphs:
+            rtl.shape_line(paragraph)
+        warm = time.perf_counter() - start
+
+        rtl.shape_line.cache_clear()
+        rtl._reshape_word.cache_clear()
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            pdfwriter.write_pdf(paragraphs, os.path.join(tmp, 'bench.pdf'), is_arabic=True)
+            render = time.perf_counter() - start
+
+        self.stdout.write(f"lines:                   {len(paragraphs)} ({len(set(paragraphs))} distinct)")
+        self.stdout.write(f"shaping, uncached:       {uncached * 1000:8.1f} ms")
+        self.stdout.write(f"shaping, cold cache:     {cold * 1000:8.1f} ms")
+        self.stdout.write(f"shaping, warm cache:     {warm * 1000:8.1f} ms")
+        self.stdout.write(f"full Arabic PDF render:  {render * 1000:8.1f} ms "
+                          f"(cold-cache shaping {cold / render:.1%} of render)")
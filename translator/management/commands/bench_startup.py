@@ -0,0 +1,59 @@
+"""
+Measure import time of the translator views versus the heavy libraries.
+
+Each measurement runs in a fresh interpreter so module caching does not skew
+the numbers. Usage: python manage.py bench_startup --runs 5
+"""
+
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from translator.startup import HEAVY_MODULES, WORKER_MODULES
+
+SNIPPET = """
+import os, sys, time
+sys.path.insert(0, {base_dir!r})
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mucyo.settings')
+import django
+django.setup()
+start = time.perf_counter()
+{body}
+sys.stderr.write('BENCH %f\\n' % (time.perf_counter() - start))
+"""
+
+
+class Command(BaseCommand):
+    help = 'Benchmark cold import time of the views (lazy) and of a full preload.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per scenario')
+
+    def _measure(self, body, runs):
+        code = SNIPPET.format(base_dir=str(settings.BASE_DIR), body=body)
+        timings = []
+        for _ in range(runs):
+            result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+            if result.returncode != 0:
+                raise RuntimeError(result.stderr.strip())
+            line = [l for l in result.stderr.splitlines() if l.startswith('BENCH ')][-1]
+            timings.append(float(line.split()[1]))
+        return timings
+
+    def handle(self, *args, **options):
+        runs = options['runs']
+        scenarios = [
+            ('views only (lazy)', 'import translator.views'),
+            ('views + heavy libraries', 'import translator.views\n' + '\n'.join(
+                f'import {name}' for name in HEAVY_MODULES)),
+            ('pool worker libraries', '\n'.join(f'import {name}' for name in WORKER_MODULES)),
+        ]
+        for label, body in scenarios:
+            timings = self._measure(body, runs)
+            self.stdout.write(
+                f"{label:<26} median {statistics.median(timings) * 1000:8.1f} ms  "
+                f"min {min(timings) * 1000:8.1f} ms  ({runs} runs)"
+            )
@@ -0,0 +1,37 @@
+"""
+Print translation counters collected across all workers.
+
+Usage: python manage.py show_metrics [--reset]
+"""
+
+from django.core.management.base import BaseCommand
+
+from translator import metrics
+
+
+class Command(BaseCommand):
+    help = 'Show token, cache and hedging counters recorded by the translation pipeline.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Clear the counters after printing')
+
+    def handle(self, *args, **options):
+        counters = metrics.snapshot()
+        if not counters:
+            self.stdout.write('No metrics recorded yet.')
+        for name, value in sorted(counters.items()):
+            self.stdout.write(f"{name:<32} {value}")
+
+        prompt_tokens = counters.get('prompt_tokens', 0)
+        if prompt_tokens:
+            cached_share = counters.get('cached_prompt_tokens', 0) / prompt_tokens
+            self.stdout.write(f"{'prompt cache hit rate':<32} {cached_share:.1%}")
+
+        requests = counters.get('openai.requests', 0)
+        if requests:
+            hedge_rate = counters.get('openai.hedges', 0) / requests
+            self.stdout.write(f"{'hedge rate':<32} {hedge_rate:.1%}")
+
+        if options['reset']:
+            metrics.reset()
+            self.stdout.write('Counters reset.')
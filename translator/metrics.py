@@ -0,0 +1,77 @@
+"""
+Counters shared by all worker processes.
+
+Counters live in a small JSON file updated under a file lock, which is cheap
+next to the OpenAI calls they describe and lets 'manage.py show_metrics'
+report totals across every gunicorn worker.
+"""
+
+import json
+import os
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+def _locked_update(update):
+    os.makedirs(os.path.dirname(settings.METRICS_FILE), exist_ok=True)
+    with open(settings.METRICS_FILE, 'a+', encoding='utf-8') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            f.seek(0)
+            try:
+                counters = json.loads(f.read() or '{}')
+            except ValueError:
+                counters = {}
+            if update(counters):
+                f.seek(0)
+                f.truncate()
+                json.dump(counters, f, sort_keys=True)
+            return counters
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def increment(name, value=1):
+    """Add value to the named counter."""
+    if not value:
+        return
+
+    def update(counters):
+        counters[name] = counters.get(name, 0) + value
+        return True
+
+    try:
+        _locked_update(update)
+    except OSError as e:
+        print(f"Warning: could not update metric {name}: {e}")
+
+
+def observe(name, value):
+    """Record a sample: keeps name.count, name.total and name.max."""
+    def update(counters):
+        counters[f"{name}.count"] = counters.get(f"{name}.count", 0) + 1
+        counters[f"{name}.total"] = round(counters.get(f"{name}.total", 0) + value, 6)
+        counters[f"{name}.max"] = max(counters.get(f"{name}.max", value), value)
+        return True
+
+    try:
+        _locked_update(update)
+    except OSError as e:
+        print(f"Warning: could not update metric {name}: {e}")
+
+
+def snapshot():
+    """Return a copy of all counters."""
+    return dict(_locked_update(lambda counters: False))
+
+
+def reset():
+    """Clear all counters."""
+    _locked_update(lambda counters: counters.clear() or True)
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:58
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('document_id', models.UUIDField(db_index=True, default=uuid.uuid4)),
+                ('revision', models.PositiveIntegerField(default=1)),
+                ('source_language', models.CharField(max_length=32)),
+                ('target_language', models.CharField(max_length=32)),
+                ('source_paragraphs', models.JSONField(default=list)),
+                ('translated_paragraphs', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-revision'],
+                'unique_together': {('document_id', 'revision')},
+            },
+        ),
+    ]
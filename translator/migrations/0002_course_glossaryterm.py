@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('translator', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Course',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='GlossaryTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_language', models.CharField(max_length=32)),
+                ('target_language', models.CharField(max_length=32)),
+                ('term', models.CharField(max_length=200)),
+                ('translation', models.CharField(max_length=200)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='glossary_terms', to='translator.course')),
+            ],
+            options={
+                'ordering': ['term'],
+                'indexes': [models.Index(fields=['course', 'source_language', 'target_language'], name='translator__course__497183_idx')],
+                'unique_together': {('course', 'source_language', 'target_language', 'term')},
+            },
+        ),
+    ]
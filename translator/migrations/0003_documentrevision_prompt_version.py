@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('translator', '0002_course_glossaryterm'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documentrevision',
+            name='prompt_version',
+            field=models.CharField(blank=True, max_length=32),
+        ),
+    ]
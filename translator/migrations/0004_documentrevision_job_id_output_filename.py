@@ -0,0 +1,37 @@
+import uuid
+
+from django.db import migrations, models
+
+
+def populate_job_ids(apps, schema_editor):
+    DocumentRevision = apps.get_model('translator', 'DocumentRevision')
+    for revision in DocumentRevision.objects.all():
+        revision.job_id = uuid.uuid4()
+        revision.save(update_fields=['job_id'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('translator', '0003_documentrevision_prompt_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documentrevision',
+            name='output_filename',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        # Unique UUIDs for existing rows need the add/populate/alter sequence
+        migrations.AddField(
+            model_name='documentrevision',
+            name='job_id',
+            field=models.UUIDField(null=True),
+        ),
+        migrations.RunPython(populate_job_ids, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='documentrevision',
+            name='job_id',
+            field=models.UUIDField(default=uuid.uuid4, unique=True),
+        ),
+    ]
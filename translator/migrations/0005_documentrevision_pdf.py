@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:14
+
+from django.db import migrations, models
+import translator.files
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('translator', '0004_documentrevision_job_id_output_filename'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documentrevision',
+            name='pdf',
+            field=models.FileField(blank=True, storage=translator.files.translations_storage, upload_to=''),
+        ),
+    ]
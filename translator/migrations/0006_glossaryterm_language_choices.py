@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-19 15:47
+
+from django.db import IntegrityError, migrations, models, transaction
+
+LANGUAGE_KEYS = {'english', 'french', 'arabic', 'swahili', 'kinyarwanda'}
+
+
+def normalise_languages(apps, schema_editor):
+    """Rewrite terms entered as e.g. "French" to the language keys lookups use."""
+    GlossaryTerm = apps.get_model('translator', 'GlossaryTerm')
+    for term in GlossaryTerm.objects.all():
+        source = term.source_language.strip().lower()
+        target = term.target_language.strip().lower()
+        if (source, target) == (term.source_language, term.target_language):
+            continue
+        if source not in LANGUAGE_KEYS or target not in LANGUAGE_KEYS:
+            print(f"Warning: glossary term {term.pk} has unknown languages; fix it in the admin")
+            continue
+        term.source_language, term.target_language = source, target
+        try:
+            with transaction.atomic():
+                term.save(update_fields=['source_language', 'target_language'])
+        except IntegrityError:
+            print(f"Warning: glossary term {term.pk} duplicates an existing term; fix it in the admin")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('translator', '0005_documentrevision_pdf'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalise_languages, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='glossaryterm',
+            name='source_language',
+            field=models.CharField(choices=[('english', 'English'), ('french', 'French'), ('arabic', 'Arabic'), ('swahili', 'Swahili'), ('kinyarwanda', 'Kinyarwanda')], max_length=32),
+        ),
+        migrations.AlterField(
+            model_name='glossaryterm',
+            name='target_language',
+            field=models.CharField(choices=[('english', 'English'), ('french', 'French'), ('arabic', 'Arabic'), ('swahili', 'Swahili'), ('kinyarwanda', 'Kinyarwanda')], max_length=32),
+        ),
+    ]
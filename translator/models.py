@@ -0,0 +1,74 @@
+import uuid
+
+from django.db import models
+
+from .files import translations_storage
+
+# Supported languages: (key used throughout the app, display name)
+LANGUAGE_CHOICES = [
+    ('english', 'English'),
+    ('french', 'French'),
+    ('arabic', 'Arabic'),
+    ('swahili', 'Swahili'),
+    ('kinyarwanda', 'Kinyarwanda'),
+]
+
+
+class DocumentRevision(models.Model):
+    """
+    One translated upload of a document, stored paragraph by paragraph.
+
+    Re-uploads that carry the same document_id only retranslate paragraphs
+    that changed since the latest revision for that language pair. job_id
+    identifies this upload in the success/download URLs; its PDF is only
+    rendered when it is first downloaded and then kept in the translations
+    storage.
+    """
+    job_id = models.UUIDField(default=uuid.uuid4, unique=True)
+    document_id = models.UUIDField(default=uuid.uuid4, db_index=True)
+    output_filename = models.CharField(max_length=255, blank=True)
+    pdf = models.FileField(storage=translations_storage, blank=True)
+    revision = models.PositiveIntegerField(default=1)
+    source_language = models.CharField(max_length=32)
+    target_language = models.CharField(max_length=32)
+    source_paragraphs = models.JSONField(default=list)
+    translated_paragraphs = models.JSONField(default=list)
+    prompt_version = models.CharField(max_length=32, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-revision']
+        unique_together = [('document_id', 'revision')]
+
+    def __str__(self):
+        return f"{self.document_id} r{self.revision} ({self.source_language} -> {self.target_language})"
+
+
+class Course(models.Model):
+    """A course whose documents share a glossary of technical terms."""
+    name = models.CharField(max_length=200, unique=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
+class GlossaryTerm(models.Model):
+    """Required translation of a term for one course and language pair."""
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='glossary_terms')
+    # Lookups use the language keys, so free text such as "French" would never match
+    source_language = models.CharField(max_length=32, choices=LANGUAGE_CHOICES)
+    target_language = models.CharField(max_length=32, choices=LANGUAGE_CHOICES)
+    term = models.CharField(max_length=200)
+    translation = models.CharField(max_length=200)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['term']
+        unique_together = [('course', 'source_language', 'target_language', 'term')]
+        indexes = [models.Index(fields=['course', 'source_language', 'target_language'])]
+
+    def __str__(self):
+        return f"{self.term} -> {self.translation}"
@@ -0,0 +1,199 @@
+"""
+OCR fallback for scanned PDFs.
+
+Pages without a text layer are rasterized and run through a local Tesseract
+engine in a process pool, so a multi-page scan is recognised in parallel.
+Recognised text is cached on disk by page hash; re-uploading the same scan
+skips OCR entirely. Requires pytesseract + pdf2image and the tesseract /
+poppler binaries; without them OCR is reported as unavailable.
+"""
+
+import hashlib
+import multiprocessing
+import os
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+from . import guardrails
+
+# Tesseract traineddata names for our source languages. Kinyarwanda has no
+# dedicated model, so the Latin-script English model is the closest fit.
+TESSERACT_LANGUAGES = {
+    'english': 'eng',
+    'french': 'fra',
+    'arabic': 'ara',
+    'swahili': 'swa',
+    'kinyarwanda': 'eng',
+}
+
+_pool = None
+
+
+def is_available():
+    """Return True if OCR is enabled and the local engine can be used."""
+    return getattr(settings, 'OCR_ENABLED', False) and _engine_installed()
+
+
+@lru_cache(maxsize=None)
+def _engine_installed():
+    try:
+        import pytesseract
+        import pdf2image  # noqa: F401
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        return False
+
+
+def _get_pool():
+    """
+    Create the OCR process pool on first use (never in the gunicorn master).
+
+    Workers run under the memory rlimit from OCR_WORKER_BUDGET and are
+    replaced after OCR_MAX_TASKS_PER_CHILD pages so leaked memory is returned.
+    """
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.OCR_MAX_WORKERS,
+            mp_context=multiprocessing.get_context('spawn'),
+            max_tasks_per_child=settings.OCR_MAX_TASKS_PER_CHILD,
+            initializer=guardrails.limit_pool_worker,
+            initargs=(None, settings.OCR_WORKER_BUDGET.get('memory_mb')),
+        )
+    return _pool
+
+
+def _discard_pool():
+    """Kill the pool's workers, e.g. after a job was cancelled or a worker died."""
+    global _pool
+    if _pool is None:
+        return
+    # Running tasks cannot be cancelled, so stop their processes directly
+    for process in list((_pool._processes or {}).values()):
+        process.terminate()
+    _pool.shutdown(wait=False, cancel_futures=True)
+    _pool = None
+
+
+def page_hash(page):
+    """Hash a PyPDF2 page by its content stream and embedded images."""
+    digest = hashlib.sha256()
+    try:
+        contents = page.get_contents()
+        if contents is not None:
+            digest.update(contents.get_data())
+        xobjects = page['/Resources'].get('/XObject', {})
+        for name in sorted(xobjects):
+            digest.update(xobjects[name].get_object().get_data())
+    except Exception:
+        return None
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _installed_languages():
+    """Return the traineddata installed for the local engine (may be empty)."""
+    import pytesseract
+
+    try:
+        return frozenset(pytesseract.get_languages(config=''))
+    except Exception as e:
+        print(f"Warning: could not list Tesseract languages: {e}")
+        return frozenset()
+
+
+def _tesseract_language(source_language):
+    """Return the traineddata for a source language, falling back to English if missing."""
+    lang = TESSERACT_LANGUAGES.get(source_language, 'eng')
+    if lang != 'eng' and lang not in _installed_languages():
+        print(f"Warning: Tesseract language '{lang}' is not installed; using 'eng' instead")
+        return 'eng'
+    return lang
+
+
+def _cache_path(key, lang):
+    return os.path.join(settings.OCR_CACHE_FOLDER, f"{key}.{lang}.txt")
+
+
+def _read_cache(key, lang):
+    try:
+        with open(_cache_path(key, lang), 'r', encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _write_cache(key, lang, text):
+    os.makedirs(settings.OCR_CACHE_FOLDER, exist_ok=True)
+    path = _cache_path(key, lang)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def _ocr_page(file_path, page_number, lang, dpi, cpu_seconds=None):
+    """Rasterize and OCR a single page (1-based). Runs inside a pool worker."""
+    guardrails.limit_pool_worker(cpu_seconds=cpu_seconds)
+
+    import pytesseract
+    from pdf2image import convert_from_path
+
+    images = convert_from_path(file_path, dpi=dpi, first_page=page_number, last_page=page_number)
+    return "\n".join(pytesseract.image_to_string(image, lang=lang) for image in images).strip()
+
+
+def ocr_pages(file_path, pages, source_language):
+    """
+    OCR the given pages of a PDF in parallel.
+
+    pages is a list of (index, page_hash) tuples with 0-based indexes.
+    Returns a dict mapping page index to recognised text. A page that cannot
+    be recognised is left empty rather than failing the whole document; only
+    budget overruns are raised.
+    """
+    lang = _tesseract_language(source_language)
+    results = {}
+    pending = {}
+
+    for index, key in pages:
+        cached = _read_cache(key, lang) if key else None
+        if cached is not None:
+            results[index] = cached
+        else:
+            pending[index] = key
+
+    if pending:
+        print(f"DEBUG: Running OCR on {len(pending)} page(s)")
+        pool = _get_pool()
+        futures = {
+            index: pool.submit(
+                _ocr_page, file_path, index + 1, lang, settings.OCR_DPI,
+                settings.OCR_WORKER_BUDGET.get('cpu_seconds')
+            )
+            for index in pending
+        }
+        for index, future in futures.items():
+            try:
+                text = future.result()
+            except guardrails.BudgetExceeded:
+                _discard_pool()
+                raise
+            except (BrokenProcessPool, MemoryError):
+                _discard_pool()
+                raise guardrails.BudgetExceeded(
+                    f"OCR of page {index + 1} exceeded its CPU or memory budget and was stopped."
+                )
+            except Exception as e:
+                print(f"Warning: OCR failed on page {index + 1}, leaving it empty: {str(e)}")
+                results[index] = ""
+                continue
+            results[index] = text
+            if pending[index]:
+                _write_cache(pending[index], lang, text)
+
+    return results
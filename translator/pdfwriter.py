@@ -0,0 +1,152 @@
+"""
+Page-streamed PDF rendering for translated documents.
+
+SimpleDocTemplate needs the whole story of flowables up front and keeps every
+page's uncompressed content until the file is saved. PageStreamWriter instead
+lays paragraphs out one at a time into the current page and finishes the page
+as soon as it is full, so only one page of flowables is alive at a time.
+Finished page streams are compressed straight away and only those compressed
+bytes are held until save(), which keeps peak memory close to flat however
+long the document is.
+
+Streams are written as binary Flate data at the highest compression level
+instead of ReportLab's default ASCII85-wrapped text, which is a quarter
+larger. TrueType fonts such as the Arabic font are embedded as subsets of the
+glyphs actually used.
+"""
+
+import zlib
+
+from django.conf import settings
+
+from . import rtl
+
+PARAGRAPH_GAP_INCHES = 0.2
+
+
+def _arabic_font_name():
+    """Register the first available Arabic TrueType font once per process."""
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    if 'Arabic' in pdfmetrics.getRegisteredFontNames():
+        return 'Arabic'
+    for path in settings.PDF_ARABIC_FONTS:
+        try:
+            pdfmetrics.registerFont(TTFont('Arabic', path))
+            return 'Arabic'
+        except Exception:
+            continue
+    print("Warning: no Arabic TrueType font found; falling back to Helvetica")
+    return 'Helvetica'
+
+
+class PageStreamWriter:
+    """Write paragraphs to a PDF, flushing each page as soon as it is full."""
+
+    def __init__(self, output_path, is_arabic=False):
+        from reportlab.lib.enums import TA_RIGHT
+        from reportlab.lib.pagesizes import letter
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.units import inch
+        from reportlab.pdfgen.canvas import Canvas
+
+        self.is_arabic = is_arabic
+        self.page_size = letter
+        self.margin = inch
+        self.gap = PARAGRAPH_GAP_INCHES * inch
+        self.pages = 0
+
+        styles = getSampleStyleSheet()
+        if is_arabic:
+            # RTL style for Arabic
+            self.style = ParagraphStyle(
+                'Arabic',
+                parent=styles['Normal'],
+                fontName=_arabic_font_name(),
+                fontSize=12,
+                alignment=TA_RIGHT,
+                wordWrap='RTL'
+            )
+        else:
+            self.style = styles['Normal']
+
+        self.canvas = Canvas(output_path, pagesize=letter)
+        self.canvas.setPageCallBack(self._compress_page)
+        self._new_frame()
+
+    def _new_frame(self):
+        from reportlab.platypus import Frame
+
+        width, height = self.page_size
+        self.frame = Frame(self.margin, self.margin, width - 2 * self.margin, height - 2 * self.margin)
+
+    def _next_page(self):
+        self.canvas.showPage()
+        self._new_frame()
+
+    def _compress_page(self, page_number):
+        """Replace the page just finished with its Flate-compressed stream."""
+        from reportlab.pdfbase.pdfdoc import PDFArray, PDFName, PDFStream
+
+        page = self.canvas._doc.Pages.pages[-1]
+        contents = PDFStream(content=zlib.compress(page.stream.encode('utf-8'), settings.PDF_COMPRESSION_LEVEL))
+        contents.dictionary['Filter'] = PDFArray([PDFName('FlateDecode')])
+        page.Contents = contents
+        page.stream = None
+        self.pages += 1
+
+    def _add(self, flowable):
+        pending = [flowable]
+        while pending:
+            flowable = pending.pop(0)
+            if self.frame.add(flowable, self.canvas):
+                continue
+            # Split across the page break, like SimpleDocTemplate does
+            parts = self.frame.split(flowable, self.canvas)
+            if parts and self.frame.add(parts[0], self.canvas):
+                pending[:0] = parts[1:]
+            elif self.frame._atTop:
+                raise Exception("A paragraph is too large to fit on a page.")
+            else:
+                pending.insert(0, flowable)
+            self._next_page()
+
+    def add_paragraph(self, text):
+        """Lay out one paragraph; blank paragraphs are skipped."""
+        from reportlab.platypus import Paragraph, Spacer
+
+        if not text.strip():
+            return
+        if self.is_arabic:
+            # Shaping is cached per distinct line
+            text = rtl.shape_line(text)
+        self._add(Paragraph(text, self.style))
+        # The gap after a paragraph is dropped at the bottom of a page
+        if not self.frame.add(Spacer(1, self.gap), self.canvas):
+            self._next_page()
+
+    def add_paragraphs(self, paragraphs):
+        for text in paragraphs:
+            self.add_paragraph(text)
+
+    def save(self):
+        """Finish the last page and write the file."""
+        from reportlab import rl_config
+
+        if not self.frame._atTop or self.pages == 0:
+            self.canvas.showPage()
+        # Embedded font subsets are written as binary Flate streams too
+        use_a85 = rl_config.useA85
+        rl_config.useA85 = 0
+        try:
+            self.canvas.save()
+        finally:
+            rl_config.useA85 = use_a85
+
+
+def write_pdf(paragraphs, output_path, is_arabic=False):
+    """Render paragraphs to output_path; the render stage's worker entry point."""
+    writer = PageStreamWriter(output_path, is_arabic=is_arabic)
+    writer.add_paragraphs(paragraphs)
+    writer.save()
@@ -0,0 +1,80 @@
+"""
+Versioned prompt registry.
+
+Messages are laid out for OpenAI's automatic prompt caching, which reuses the
+longest previously seen prefix of a request: the static instruction block for
+the language pair comes first, then the glossary terms (sorted so the same
+set is always byte-identical), and only the final message carries the
+document chunk. Bump PROMPT_VERSION whenever any text here changes; it is
+part of every cache key that stores model output.
+"""
+
+PROMPT_VERSION = 'translate-v2'
+
+TRANSLATION_MODEL = 'gpt-4o'
+DETECTION_MODEL = 'gpt-3.5-turbo'
+# Only the start of a document is sent for language detection
+DETECTION_SAMPLE_CHARS = 500
+
+TRANSLATION_SYSTEM = "You are a professional translator specializing in educational documents with high accuracy."
+
+# Per-target instruction blocks; 'default' covers every language without its own entry
+TRANSLATION_INSTRUCTIONS = {
+    'kinyarwanda': """You are an expert translator specializing in Kinyarwanda language.
+
+Translate the text in the last message from {source_language} to Kinyarwanda.
+- Use proper Kinyarwanda grammar, vocabulary, and sentence structure.
+- Ensure natural, fluent Kinyarwanda that native speakers would use.
+- Maintain academic accuracy for educational content.
+- Use correct Kinyarwanda spelling and diacritics.
+- Only output the translated text, no explanations.
+- Keep every line of the form @@N@@ exactly as it is; they separate paragraphs.""",
+
+    'default': """You are a professional translator for educational documents.
+
+Translate the text in the last message from {source_language} to {target_language}.
+- Keep the meaning exact and accurate with high precision.
+- Use clear and natural language suitable for students.
+- Maintain any academic or technical terms as precisely as possible.
+- Preserve formatting and structure.
+- Do not add explanations, only output the translated text.
+- Keep every line of the form @@N@@ exactly as it is; they separate paragraphs.""",
+}
+
+GLOSSARY_HEADER = "Always use these translations for the following terms:"
+
+DETECTION_SYSTEM = "You are a language detection expert. Respond with only the language name."
+
+DETECTION_INSTRUCTIONS = "Detect the language of the following text. Respond with only one word from these options: English, French, Arabic, Swahili, Kinyarwanda."
+
+
+def build_translation_messages(text, source_language, target_language, glossary_terms=None):
+    """Build chat messages with the stable prefix first and the document chunk last."""
+    template = TRANSLATION_INSTRUCTIONS.get(target_language.lower(), TRANSLATION_INSTRUCTIONS['default'])
+    instructions = template.format(source_language=source_language, target_language=target_language)
+
+    messages = [{"role": "system", "content": f"{TRANSLATION_SYSTEM}\n\n{instructions}"}]
+    if glossary_terms:
+        lines = "".join(f"\n{term} => {translation}" for term, translation in sorted(glossary_terms))
+        messages.append({"role": "system", "content": GLOSSARY_HEADER + lines})
+    messages.append({"role": "user", "content": f"Text to translate:\n{text}"})
+    return messages
+
+
+def detection_sample(text):
+    """Return the part of a document that is sent for language detection."""
+    return text[:DETECTION_SAMPLE_CHARS]
+
+
+def build_detection_messages(text):
+    """Build chat messages for language detection."""
+    return [
+        {"role": "system", "content": DETECTION_SYSTEM},
+        {"role": "user", "content": f"{DETECTION_INSTRUCTIONS}\n\nText: {detection_sample(text)}..."},
+    ]
+
+
+def cached_tokens(usage):
+    """Return the number of prompt tokens served from OpenAI's prompt cache."""
+    details = getattr(usage, 'prompt_tokens_details', None)
+    return getattr(details, 'cached_tokens', 0) or 0
@@ -0,0 +1,141 @@
+"""
+Revision-aware translation of edited documents.
+
+Extracted text is split into paragraphs, which are the units that are
+diffed, translated and laid out by create_pdf_file. When a document is
+re-uploaded, paragraphs whose source text is unchanged reuse the translation
+stored with the latest revision for the same language pair; only new or
+edited paragraphs are sent to OpenAI.
+"""
+
+import re
+
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+
+from .models import DocumentRevision
+from .prompts import PROMPT_VERSION
+
+# A line ending in one of these finishes its paragraph
+SENTENCE_ENDINGS = ('.', '!', '?', ':', '\u061f', '\u06d4')
+# Only lines at least this share of the block's widest line can have wrapped
+FULL_LINE_RATIO = 0.8
+# Bulleted and numbered list items always start their own paragraph
+LIST_ITEM = re.compile(r'^[-\u2022*\d]+[.)]?\s')
+# Concurrent uploads of one document can race for the next revision number
+SAVE_ATTEMPTS = 3
+
+
+def _join_lines(lines):
+    text = lines[0]
+    for line in lines[1:]:
+        # Keep hyphenated words that were wrapped together
+        text += line if text.endswith('-') else f" {line}"
+    return text
+
+
+def _continues(previous, line, full_width):
+    """Return True if line is the wrapped continuation of the previous line."""
+    return (
+        len(previous) >= FULL_LINE_RATIO * full_width
+        and not previous.endswith(SENTENCE_ENDINGS)
+        and not LIST_ITEM.match(line)
+        # A wrapped sentence does not continue with a capital letter
+        and not line[0].isupper()
+    )
+
+
+def split_paragraphs(text):
+    """
+    Split extracted text into the paragraph units used for diffing.
+
+    Blank lines always separate paragraphs (DOCX text has one between every
+    paragraph). PDF text has a line break after every visual line, so a line
+    is joined to the one before only when it was clearly wrapped: the previous
+    line runs close to full width without finishing a sentence, and this line
+    is neither a list item nor starts with a capital. Headings, list items and
+    table rows therefore stay separate lines.
+    """
+    paragraphs = []
+    for block in re.split(r'\n[ \t]*\n', text):
+        lines = [line.strip() for line in block.split('\n') if line.strip()]
+        if not lines:
+            continue
+        full_width = max(len(line) for line in lines)
+        current = [lines[0]]
+        for previous, line in zip(lines, lines[1:]):
+            if _continues(previous, line, full_width):
+                current.append(line)
+            else:
+                paragraphs.append(_join_lines(current))
+                current = [line]
+        paragraphs.append(_join_lines(current))
+    return paragraphs
+
+
+def latest_revision(document_id, source_language, target_language):
+    """Return the most recent revision for a document and language pair, or None."""
+    if not document_id:
+        return None
+    return DocumentRevision.objects.filter(
+        document_id=document_id,
+        source_language=source_language,
+        target_language=target_language,
+    ).first()
+
+
+def diff_paragraphs(paragraphs, previous):
+    """
+    Match paragraphs against a previous revision.
+
+    Returns (translations, changed) where translations holds the reused
+    translation for each unchanged paragraph (None otherwise) and changed
+    lists the indexes of paragraphs that need translating.
+    """
+    known = {}
+    # Translations made with an older prompt version are not reused
+    if (previous is not None and previous.prompt_version == PROMPT_VERSION
+            and len(previous.source_paragraphs) == len(previous.translated_paragraphs)):
+        known = dict(zip(previous.source_paragraphs, previous.translated_paragraphs))
+
+    translations = []
+    changed = []
+    for index, paragraph in enumerate(paragraphs):
+        if not paragraph:
+            translations.append('')
+        elif paragraph in known:
+            translations.append(known[paragraph])
+        else:
+            translations.append(None)
+            changed.append(index)
+    return translations, changed
+
+
+def save_revision(document_id, source_language, target_language, paragraphs, translations, output_filename=''):
+    """
+    Store a new revision and return it.
+
+    Revision numbers count every upload of a document, across language pairs.
+    """
+    fields = {
+        'output_filename': output_filename,
+        'source_language': source_language,
+        'target_language': target_language,
+        'source_paragraphs': paragraphs,
+        'translated_paragraphs': translations,
+        'prompt_version': PROMPT_VERSION,
+    }
+    if not document_id:
+        return DocumentRevision.objects.create(revision=1, **fields)
+
+    for attempt in range(SAVE_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                latest = DocumentRevision.objects.filter(document_id=document_id).aggregate(Max('revision'))
+                return DocumentRevision.objects.create(
+                    document_id=document_id, revision=(latest['revision__max'] or 0) + 1, **fields
+                )
+        except IntegrityError:
+            # Another upload of this document took the number first
+            if attempt == SAVE_ATTEMPTS - 1:
+                raise
@@ -0,0 +1,91 @@
+"""
+Shaping for right-to-left output.
+
+Arabic text must be reshaped (joined letter forms) and reordered for display
+before ReportLab can draw it. Both steps are pure Python and slow, so this
+module caches at two levels: whole lines (headers, footers and other
+recurring lines) and individual words, since letters never join across a
+space and real text reuses a small vocabulary. Lines made only of
+right-to-left letters and spaces skip the bidi algorithm, whose result for
+them is simply the reversed string.
+"""
+
+import re
+import unicodedata
+from functools import cached_property, lru_cache
+
+# Target languages written right to left
+RTL_LANGUAGES = {'arabic'}
+
+LINE_CACHE_SIZE = 4096
+WORD_CACHE_SIZE = 65536
+
+
+def is_rtl(language):
+    """Return True if the language key is written right to left."""
+    return language in RTL_LANGUAGES
+
+
+@lru_cache(maxsize=None)
+def _get_reshaper():
+    """
+    Build the shared Arabic reshaper.
+
+    arabic_reshaper 3.0 means to cache its compiled ligature regex but the
+    check never matches, so the pattern is rebuilt from the config on every
+    reshape() call. That dominates shaping time; cache it on the instance.
+    """
+    from arabic_reshaper import ArabicReshaper
+
+    class CachedLigaturesReshaper(ArabicReshaper):
+        @cached_property
+        def _ligatures_re(self):
+            return ArabicReshaper._ligatures_re.fget(self)
+
+    return CachedLigaturesReshaper()
+
+
+@lru_cache(maxsize=None)
+def _words_are_independent():
+    """Return False if a multi-word ligature is enabled in the reshaper config."""
+    from arabic_reshaper.ligatures import LIGATURES
+
+    reshaper = _get_reshaper()
+    return not any(
+        ' ' in pattern and reshaper.configuration.getboolean(name)
+        for name, (pattern, _forms) in LIGATURES
+    )
+
+
+@lru_cache(maxsize=None)
+def _pure_rtl_re():
+    """Match lines containing only strong right-to-left characters and spaces."""
+    ranges = [(0x0590, 0x08FF), (0xFB1D, 0xFDFF), (0xFE70, 0xFEFF)]
+    chars = ''.join(
+        chr(code) for start, end in ranges for code in range(start, end + 1)
+        if unicodedata.bidirectional(chr(code)) in ('R', 'AL')
+    )
+    return re.compile(f"[ {re.escape(chars)}]*")
+
+
+@lru_cache(maxsize=WORD_CACHE_SIZE)
+def _reshape_word(word):
+    return _get_reshaper().reshape(word)
+
+
+def _reshape(line):
+    if _words_are_independent():
+        return ' '.join(_reshape_word(word) for word in line.split(' '))
+    return _get_reshaper().reshape(line)
+
+
+@lru_cache(maxsize=LINE_CACHE_SIZE)
+def shape_line(line):
+    """Reshape and reorder a single line for visual (left-to-right) drawing."""
+    from bidi.algorithm import get_display
+
+    reshaped = _reshape(line)
+    if _pure_rtl_re().fullmatch(reshaped):
+        return reshaped[::-1]
+    return get_display(reshaped)
+
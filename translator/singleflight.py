@@ -0,0 +1,129 @@
+"""
+Single-flight coordination for identical translation jobs.
+
+When several students upload the same handout at the same moment, only one
+request calls OpenAI; the others wait on a file lock and reuse its result.
+The lock lives on the filesystem so it works across gunicorn worker processes.
+Results and locks that have not been used for SINGLEFLIGHT_RESULT_TTL are
+swept away by later calls, so the folder does not grow with every document.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:
+    # Windows development machines have no fcntl; jobs simply run uncoordinated
+    fcntl = None
+
+_last_sweep = 0.0
+
+
+def make_key(content_hash, source_language, target_language, *extra):
+    """Build the single-flight key for a document, language pair and any extra job inputs."""
+    raw = ":".join(str(part) for part in (content_hash, source_language, target_language) + extra)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def _result_path(key):
+    return os.path.join(settings.SINGLEFLIGHT_FOLDER, f"{key}.json")
+
+
+def _read_result(key):
+    """Return the stored result for key, or None if missing or expired."""
+    path = _result_path(key)
+    try:
+        if time.time() - os.path.getmtime(path) > settings.SINGLEFLIGHT_RESULT_TTL:
+            os.remove(path)
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)['value']
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _write_result(key, value):
+    """Atomically store the result so waiting workers never see a partial file."""
+    path = _result_path(key)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'value': value}, f)
+    os.replace(tmp_path, path)
+
+
+def _sweep():
+    """Delete expired results, stale temporary files and idle locks (at most once per TTL)."""
+    global _last_sweep
+    now = time.time()
+    ttl = settings.SINGLEFLIGHT_RESULT_TTL
+    if now - _last_sweep < ttl:
+        return
+    _last_sweep = now
+
+    for entry in os.scandir(settings.SINGLEFLIGHT_FOLDER):
+        try:
+            if now - entry.stat().st_mtime <= ttl:
+                continue
+            if not entry.name.endswith('.lock'):
+                os.remove(entry.path)
+                continue
+            # Only remove a lock nobody holds or waits on; do() notices if its
+            # lock file was removed while it waited and opens a fresh one
+            with open(entry.path, 'a') as lock_file:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    continue
+                os.remove(entry.path)
+        except OSError:
+            continue
+
+
+def _lock(lock_path):
+    """Open and exclusively lock lock_path, returning the open file."""
+    while True:
+        lock_file = open(lock_path, 'a')
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            if os.fstat(lock_file.fileno()).st_ino == os.stat(lock_path).st_ino:
+                # Mark the lock as recently used so the sweep leaves it alone
+                os.utime(lock_path)
+                return lock_file
+        except FileNotFoundError:
+            pass
+        # The sweep removed this lock file while we waited on it
+        lock_file.close()
+
+
+def do(key, fn):
+    """
+    Run fn() once per key across all workers.
+
+    The first caller takes an exclusive lock and runs fn(); concurrent callers
+    block on the same lock and return the leader's result. If the leader fails,
+    the next waiter finds no result and runs fn() itself.
+    """
+    if fcntl is None:
+        return fn()
+
+    os.makedirs(settings.SINGLEFLIGHT_FOLDER, exist_ok=True)
+    _sweep()
+    lock_path = os.path.join(settings.SINGLEFLIGHT_FOLDER, f"{key}.lock")
+
+    with _lock(lock_path) as lock_file:
+        try:
+            value = _read_result(key)
+            if value is not None:
+                print(f"DEBUG: Single-flight hit for {key[:12]}")
+                return value
+
+            value = fn()
+            _write_result(key, value)
+            return value
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,57 @@
+"""
+Startup hooks for the translator app.
+
+Heavy libraries are imported lazily. In production the gunicorn master calls
+preload() once before forking (see gunicorn.conf.py), so every worker shares
+the already-imported OpenAI client copy-on-write instead of paying the import
+cost on its first request.
+
+The document libraries are only used by the extract and render pool workers
+(see guardrails.run_isolated). Those are forked from a per-worker fork server
+that imports WORKER_MODULES once, so neither the web workers nor every new
+pool process pay for them.
+"""
+
+import importlib
+import os
+import time
+
+from django.conf import settings
+
+# Libraries the web workers need to translate documents
+HEAVY_MODULES = [
+    'openai',
+]
+
+# Libraries only needed to extract and render documents in pool workers
+WORKER_MODULES = [
+    'PyPDF2',
+    'docx',
+    'reportlab.platypus',
+    'reportlab.lib.styles',
+    'reportlab.pdfbase.ttfonts',
+    'arabic_reshaper',
+    'bidi.algorithm',
+    'translator.extraction',
+    'translator.pdfwriter',
+]
+
+
+def ensure_directories():
+    """Create the working folders the app writes to."""
+    for folder in (settings.STATIC_ROOT, settings.UPLOAD_FOLDER, settings.TRANSLATIONS_FOLDER):
+        os.makedirs(folder, exist_ok=True)
+
+
+def preload():
+    """Import heavy libraries and build the OpenAI client ahead of the first request."""
+    from . import views
+
+    start = time.perf_counter()
+    for module_name in HEAVY_MODULES:
+        try:
+            importlib.import_module(module_name)
+        except ImportError as e:
+            print(f"Warning: could not preload {module_name}: {e}")
+    views.get_client()
+    print(f"DEBUG: Preloaded {len(HEAVY_MODULES)} modules in {time.perf_counter() - start:.2f}s")
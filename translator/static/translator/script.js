@@ -266,11 +266,33 @@ setTimeout(() => {
     });
 }, 5000);
 
+// Copy the translation preview on the success page to the clipboard
+const copyBtn = document.getElementById('copyTranslation');
+if (copyBtn && navigator.clipboard) {
+    copyBtn.addEventListener('click', () => {
+        const target = document.getElementById(copyBtn.dataset.target);
+        const text = Array.from(target.querySelectorAll('p')).map(p => p.textContent).join('\n\n');
+        navigator.clipboard.writeText(text).then(() => {
+            copyBtn.querySelector('span').textContent = 'Copied';
+            setTimeout(() => {
+                copyBtn.querySelector('span').textContent = 'Copy';
+            }, 2000);
+        });
+    });
+}
+
 // Initialize page
 document.addEventListener('DOMContentLoaded', () => {
     // Initialize Lucide icons
     lucide.createIcons();
     
+    // Preselect languages passed in the URL (e.g. when uploading an edited version)
+    document.querySelectorAll('select[data-selected]').forEach(select => {
+        if (select.dataset.selected) {
+            select.value = select.dataset.selected;
+        }
+    });
+    
     // Show form if there are error messages
     const flashMessages = document.querySelectorAll('.flash-message');
     if (flashMessages.length > 0 && translationFormContainer) {
@@ -0,0 +1,44 @@
+"""
+Static files storage for production.
+
+Extends WhiteNoise's CompressedManifestStaticFilesStorage (fingerprinted
+names plus precompressed .gz/.br variants) by minifying the app's own CSS and
+JavaScript before they are hashed and compressed.
+"""
+
+from django.conf import settings
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+from . import assets
+
+MINIFIERS = {
+    '.css': assets.minify_css,
+    '.js': assets.minify_js,
+}
+
+
+class MinifiedStaticFilesStorage(CompressedManifestStaticFilesStorage):
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            paths = dict(paths)
+            for name in paths:
+                if self._minify(name):
+                    # Hash and compress the minified copy, not the source file
+                    paths[name] = (self, name)
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+    def _minify(self, name):
+        """Minify the collected copy of name in place; return True if it was minified."""
+        if not name.startswith(tuple(settings.STATIC_MINIFY_PREFIXES)):
+            return False
+        extension = name[name.rfind('.'):]
+        minify = MINIFIERS.get(extension)
+        if minify is None or name.endswith(f'.min{extension}'):
+            return False
+        path = self.path(name)
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(minify(source))
+        return True
@@ -0,0 +1,29 @@
+import os
+
+from django import template
+from django.conf import settings
+from django.utils.safestring import mark_safe
+
+register = template.Library()
+
+_critical_css = None
+
+
+@register.simple_tag
+def critical_css():
+    """
+    Return the critical CSS written by 'manage.py build_assets', or an empty
+    string if the assets have not been built (e.g. in development).
+    """
+    global _critical_css
+    if _critical_css is not None:
+        return _critical_css
+
+    try:
+        with open(os.path.join(settings.STATIC_ROOT, settings.CRITICAL_CSS_NAME), 'r', encoding='utf-8') as f:
+            css = mark_safe(f.read())
+    except OSError:
+        css = ''
+    if not settings.DEBUG:
+        _critical_css = css
+    return css
@@ -0,0 +1,281 @@
+"""
+Tests for the translator app. Run with: python manage.py test translator
+"""
+
+import hashlib
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from unittest import mock, skipIf
+
+from django.contrib.messages import get_messages
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from . import glossary, guardrails, ocr, revisions, singleflight, views
+from .singleflight import fcntl
+
+
+def _future(result=None, exception=None):
+    future = Future()
+    if exception is not None:
+        future.set_exception(exception)
+    else:
+        future.set_result(result)
+    return future
+
+
+class SplitParagraphsTests(SimpleTestCase):
+    def test_short_lines_stay_separate(self):
+        self.assertEqual(
+            revisions.split_paragraphs("Item one\nItem two\nItem three"),
+            ['Item one', 'Item two', 'Item three'],
+        )
+
+    def test_wrapped_lines_are_joined(self):
+        text = ("Introduction\n"
+                "This is a long wrapped line of text that goes\n"
+                "across the page and ends here.\n"
+                "Next sentence.")
+        self.assertEqual(revisions.split_paragraphs(text), [
+            'Introduction',
+            'This is a long wrapped line of text that goes across the page and ends here.',
+            'Next sentence.',
+        ])
+
+    def test_list_items_stay_separate(self):
+        text = ("- a first bullet item that is quite long as well\n"
+                "- second\n"
+                "1. numbered one\n"
+                "2) numbered two")
+        self.assertEqual(revisions.split_paragraphs(text), [
+            '- a first bullet item that is quite long as well', '- second', '1. numbered one', '2) numbered two',
+        ])
+
+    def test_hyphenated_words_are_joined_without_space(self):
+        text = "Photosynthesis in the chloroplast is a well-\nknown process."
+        self.assertEqual(
+            revisions.split_paragraphs(text),
+            ['Photosynthesis in the chloroplast is a well-known process.'],
+        )
+
+    def test_blank_lines_separate_paragraphs(self):
+        self.assertEqual(
+            revisions.split_paragraphs("first paragraph\n\n\nsecond paragraph"),
+            ['first paragraph', 'second paragraph'],
+        )
+
+
+
+
+class TranslateParagraphsTests(SimpleTestCase):
+    paragraphs = ['alpha', 'beta', 'gamma', 'delta']
+
+    def _translate(self, indexes, lose_marker=None):
+        requests = []
+
+        def translate_text(text, *args, **kwargs):
+            requests.append(text)
+            output = text.upper()
+            if lose_marker is not None and len(requests) == 1:
+                # The model drops one marker, merging two paragraphs
+                output = output.replace(f"@@{lose_marker}@@\n", '')
+            return output
+
+        with mock.patch.object(views, 'translate_text', side_effect=translate_text):
+            translations = views.translate_paragraphs(self.paragraphs, indexes, 'english', 'french')
+        return translations, requests
+
+    def test_paragraphs_share_one_request(self):
+        translations, requests = self._translate([0, 1, 2, 3])
+        self.assertEqual(translations, ['ALPHA', 'BETA', 'GAMMA', 'DELTA'])
+        self.assertEqual(len(requests), 1)
+
+    def test_lost_marker_splits_the_batch(self):
+        translations, requests = self._translate([0, 1, 2, 3], lose_marker=2)
+        self.assertEqual(translations, ['ALPHA', 'BETA', 'GAMMA', 'DELTA'])
+        # The failed batch is retried as two halves
+        self.assertEqual(len(requests), 3)
+        self.assertEqual(requests[1], "@@0@@\nalpha\n@@1@@\nbeta")
+        self.assertEqual(requests[2], "@@2@@\ngamma\n@@3@@\ndelta")
+
+    def test_only_requested_paragraphs_are_translated(self):
+        translations, requests = self._translate([3, 1], lose_marker=1)
+        self.assertEqual(translations, ['DELTA', 'BETA'])
+        self.assertEqual(requests[1:], ['delta', 'beta'])
+
+
+class GlossaryAutomatonTests(SimpleTestCase):
+    def setUp(self):
+        self.automaton = glossary.Automaton({
+            'cell': 'cellule',
+            'Cell membrane': 'membrane cellulaire',
+            'membrane': 'membrane',
+            'stem cell': 'cellule souche',
+            'he': 'il',
+        })
+
+    def test_only_whole_words_match(self):
+        self.assertEqual(self.automaton.find('Cellular respiration in the mitochondria'), [])
+        self.assertEqual(self.automaton.find('Each cell, in turn.'), [('cell', 'cellule')])
+
+    def test_overlapping_terms_all_match(self):
+        self.assertEqual(self.automaton.find('The stem cell has a CELL membrane.'), [
+            ('stem cell', 'cellule souche'),
+            ('cell', 'cellule'),
+            ('Cell membrane', 'membrane cellulaire'),
+            ('membrane', 'membrane'),
+        ])
+
+    def test_terms_are_listed_once_in_order_of_first_occurrence(self):
+        self.assertEqual(
+            self.automaton.find('Membrane first, then a cell, then the membrane again.'),
+            [('membrane', 'membrane'), ('cell', 'cellule')],
+        )
+
+
+class OcrTests(SimpleTestCase):
+    def test_missing_language_falls_back_to_english(self):
+        with mock.patch.object(ocr, '_installed_languages', return_value=frozenset({'eng'})):
+            self.assertEqual(ocr._tesseract_language('french'), 'eng')
+        with mock.patch.object(ocr, '_installed_languages', return_value=frozenset({'eng', 'fra'})):
+            self.assertEqual(ocr._tesseract_language('french'), 'fra')
+
+    def _ocr(self, outcomes):
+        pool = mock.Mock()
+        pool.submit.side_effect = [_future(**outcome) for outcome in outcomes]
+        with mock.patch.object(ocr, '_get_pool', return_value=pool), \
+                mock.patch.object(ocr, '_discard_pool'), \
+                mock.patch.object(ocr, '_installed_languages', return_value=frozenset({'eng'})), \
+                mock.patch.object(ocr, '_write_cache'):
+            return ocr.ocr_pages('scan.pdf', [(index, None) for index in range(len(outcomes))], 'english')
+
+    def test_failed_page_is_left_empty(self):
+        results = self._ocr([{'exception': RuntimeError('tesseract crashed')}, {'result': 'page two'}])
+        self.assertEqual(results, {0: '', 1: 'page two'})
+
+    def test_budget_overrun_fails_the_document(self):
+        with self.assertRaises(guardrails.BudgetExceeded):
+            self._ocr([{'exception': BrokenProcessPool()}])
+
+
+class UploadHandlerTests(TestCase):
+    def _upload(self, name, content):
+        response = self.client.post(reverse('translator:translate'), {
+            'source_language': 'english',
+            'target_language': 'french',
+            'file': SimpleUploadedFile(name, content),
+        })
+        self.assertRedirects(response, reverse('translator:index'), fetch_redirect_response=False)
+        return [str(message) for message in get_messages(response.wsgi_request)]
+
+    def test_junk_pdf_is_rejected(self):
+        self.assertEqual(
+            self._upload('notes.pdf', b'not a pdf at all' * 30),
+            ['The file does not look like a valid PDF document.'],
+        )
+
+    def test_short_docx_is_rejected(self):
+        self.assertEqual(self._upload('notes.docx', b'abc'), ['The file does not look like a valid DOCX document.'])
+
+    def test_other_extensions_are_rejected(self):
+        self.assertEqual(
+            self._upload('notes.txt', b'plain text'),
+            ['Invalid file type. Please upload a PDF or DOCX file.'],
+        )
+
+    @override_settings(MAX_UPLOAD_SIZE=4 * 1024 * 1024)
+    def test_oversized_upload_is_stopped(self):
+        self.assertEqual(
+            self._upload('notes.pdf', b'%PDF-1.4\n' + b'x' * (5 * 1024 * 1024)),
+            ['File is too large. Maximum file size is 4MB.'],
+        )
+
+    @override_settings(MAX_UPLOAD_SIZE=1024 * 1024, DATA_UPLOAD_MAX_MEMORY_SIZE=1024)
+    def test_oversized_body_stops_before_reading_the_file(self):
+        upload = SimpleUploadedFile('notes.pdf', b'%PDF-' + b'x' * (2 * 1024 * 1024))
+        request = RequestFactory().post('/translate/', {'file': upload})
+        self.assertNotIn('file', request.FILES)
+        self.assertEqual(request.upload_errors, {'file': 'File is too large. Maximum file size is 1MB.'})
+
+    def test_digest_matches_file(self):
+        content = b'%PDF-1.4\n' + bytes(range(256)) * 1000
+        request = RequestFactory().post('/translate/', {'file': SimpleUploadedFile('notes.pdf', content)})
+        self.assertEqual(request.FILES['file'].read(), content)
+        self.assertEqual(request.upload_digests, {'file': hashlib.sha256(content).hexdigest()})
+
+
+def _flight(folder, key, log_path, fail, results):
+    """Run one single-flight call in a child process, logging every call of fn."""
+    def fn():
+        with open(log_path, 'a') as log:
+            log.write(f"{os.getpid()}\n")
+        time.sleep(0.3)
+        if fail:
+            raise RuntimeError('leader failed')
+        return os.getpid()
+
+    with override_settings(SINGLEFLIGHT_FOLDER=folder):
+        try:
+            results.put(singleflight.do(key, fn))
+        except RuntimeError:
+            results.put(None)
+
+
+@skipIf(fcntl is None, 'single-flight needs fcntl')
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder)
+        self.log_path = os.path.join(self.folder, 'calls.log')
+        self.context = multiprocessing.get_context('fork')
+
+    def _run(self, fail_first):
+        results = self.context.Queue()
+        processes = []
+        for fail in (fail_first, False):
+            process = self.context.Process(target=_flight, args=(self.folder, 'key', self.log_path, fail, results))
+            process.start()
+            processes.append(process)
+            # Make sure the first process is the leader
+            time.sleep(0.1)
+        for process in processes:
+            process.join(10)
+        with open(self.log_path) as log:
+            calls = log.read().split()
+        return calls, [results.get(timeout=1) for _ in processes]
+
+    def test_concurrent_callers_share_one_call(self):
+        calls, values = self._run(fail_first=False)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(values, [int(calls[0])] * 2)
+
+    def test_waiter_reruns_after_leader_fails(self):
+        calls, values = self._run(fail_first=True)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(values, [None, int(calls[1])])
+
+    def test_sweep_leaves_held_locks_alone(self):
+        expired = time.time() - 3600
+        paths = {name: os.path.join(self.folder, name) for name in ('a.json', 'a.lock', 'b.lock')}
+        for path in paths.values():
+            open(path, 'w').close()
+            os.utime(path, (expired, expired))
+
+        with override_settings(SINGLEFLIGHT_FOLDER=self.folder), open(paths['b.lock'], 'a') as held:
+            fcntl.flock(held, fcntl.LOCK_EX)
+            singleflight._last_sweep = 0.0
+            singleflight._sweep()
+            self.assertFalse(os.path.exists(paths['a.json']))
+            self.assertFalse(os.path.exists(paths['a.lock']))
+            self.assertTrue(os.path.exists(paths['b.lock']))
+
+            fcntl.flock(held, fcntl.LOCK_UN)
+            singleflight._last_sweep = 0.0
+            singleflight._sweep()
+            self.assertFalse(os.path.exists(paths['b.lock']))
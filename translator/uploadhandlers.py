@@ -0,0 +1,120 @@
+"""
+Upload handler that validates documents while they stream in.
+
+It sits first in FILE_UPLOAD_HANDLERS and sees every chunk before Django's
+memory/temporary-file handlers store it. Uploads that are too large or whose
+first bytes do not match their extension are rejected immediately instead of
+being fully received: oversized uploads stop the request outright (the rest
+of the body is never read), mismatched files are skipped. The SHA-256 of
+accepted files is computed on the fly so the view never has to read the file
+again to hash it.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile, StopUpload
+
+# Leading bytes of each supported document type (DOCX is a ZIP container)
+MAGIC_BYTES = {
+    'pdf': b'%PDF-',
+    'docx': b'PK\x03\x04',
+}
+
+# PDF readers accept a header anywhere in the first kilobyte
+PDF_HEADER_WINDOW = 1024
+
+
+def _too_large_message():
+    return f'File is too large. Maximum file size is {settings.MAX_UPLOAD_SIZE // (1024 * 1024)}MB.'
+
+
+class StreamingValidationUploadHandler(FileUploadHandler):
+    """
+    Sniff, size-check and hash uploads chunk by chunk.
+
+    Rejections are recorded in request.upload_errors and digests of accepted
+    files in request.upload_digests, both keyed by form field name.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.request_too_large = False
+        if request is not None:
+            request.upload_errors = {}
+            request.upload_digests = {}
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        # The whole request body is larger than any accepted file could be.
+        # Django does not catch StopUpload here, so new_file() stops the upload.
+        self.request_too_large = content_length > settings.MAX_UPLOAD_SIZE + settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+        return None
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        super().new_file(field_name, file_name, *args, **kwargs)
+        self.hasher = hashlib.sha256()
+        self.head = b''
+        self.sniffed = False
+        self.extension = file_name.rsplit('.', 1)[1].lower() if '.' in file_name else ''
+
+        if self.request_too_large or (self.content_length or 0) > settings.MAX_UPLOAD_SIZE:
+            self._abort(_too_large_message())
+        if self.extension not in MAGIC_BYTES:
+            self._reject('Invalid file type. Please upload a PDF or DOCX file.')
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > settings.MAX_UPLOAD_SIZE:
+            self._abort(_too_large_message())
+
+        if not self.sniffed:
+            self.head += raw_data[:PDF_HEADER_WINDOW]
+            # Decide as soon as the magic bytes are in, or the window is full
+            magic = MAGIC_BYTES[self.extension]
+            if len(self.head) >= PDF_HEADER_WINDOW or (
+                    magic in self.head if self.extension == 'pdf' else len(self.head) >= len(magic)):
+                self.sniffed = True
+                error = self._sniff_error()
+                if error:
+                    self._reject(error)
+
+        self.hasher.update(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        if not self.sniffed:
+            self.sniffed = True
+            error = self._sniff_error()
+            if error:
+                # SkipFile is not handled once the file is complete, so only
+                # record the error; the view rejects the upload from it
+                self._record(error)
+                return None
+        if self.request is not None:
+            self.request.upload_digests[self.field_name] = self.hasher.hexdigest()
+        return None
+
+    def _sniff_error(self):
+        """Check the leading bytes against the file extension; return an error message or None."""
+        magic = MAGIC_BYTES[self.extension]
+        if self.extension == 'pdf':
+            valid = magic in self.head[:PDF_HEADER_WINDOW]
+        else:
+            valid = self.head.startswith(magic)
+        if not valid:
+            return f'The file does not look like a valid {self.extension.upper()} document.'
+        return None
+
+    def _record(self, message):
+        print(f"DEBUG: Rejecting upload {self.file_name!r}: {message}")
+        if self.request is not None:
+            self.request.upload_errors[self.field_name] = message
+
+    def _reject(self, message):
+        """Skip this file; the rest of its data is read and discarded."""
+        self._record(message)
+        raise SkipFile()
+
+    def _abort(self, message):
+        """Stop the whole upload without reading the rest of the request body."""
+        self._record(message)
+        raise StopUpload(connection_reset=True)
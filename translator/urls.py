@@ -6,7 +6,7 @@ app_name = 'translator'
 urlpatterns = [
     path('', views.index, name='index'),
     path('translate/', views.translate, name='translate'),
-    path('success/<str:filename>/', views.success, name='success'),
-    path('download/<str:filename>/', views.download, name='download'),
+    path('success/<uuid:job_id>/', views.success, name='success'),
+    path('download/<uuid:job_id>/', views.download, name='download'),
 ]
 
@@ -4,57 +4,71 @@ A web app that translates student documents from English to Kinyarwanda, French,
 """
 
 import os
+import re
+import tempfile
+import time
+import uuid
+import hashlib
 from django.shortcuts import render, redirect
-from django.http import FileResponse, Http404
+from django.core.files import File
+from django.http import Http404
 from django.contrib import messages
 from django.conf import settings
 from django.views.decorators.http import require_http_methods
 from django.utils.text import get_valid_filename
-from openai import OpenAI
-import PyPDF2
-from docx import Document
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib.enums import TA_RIGHT
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from arabic_reshaper import reshape
-from bidi.algorithm import get_display
+
+from . import extraction, files, glossary, guardrails, hedging, metrics, ocr, pdfwriter, prompts, revisions, rtl, singleflight
+from .models import LANGUAGE_CHOICES, Course, DocumentRevision
 
 # Allowed file extensions
 ALLOWED_EXTENSIONS = {'pdf', 'docx'}
 
 # Supported languages
-LANGUAGES = {
-    'english': 'English',
-    'french': 'French',
-    'arabic': 'Arabic',
-    'swahili': 'Swahili',
-    'kinyarwanda': 'Kinyarwanda'
+LANGUAGES = dict(LANGUAGE_CHOICES)
+
+# HTML lang attributes for the on-page translation preview
+LANGUAGE_CODES = {
+    'english': 'en',
+    'french': 'fr',
+    'arabic': 'ar',
+    'swahili': 'sw',
+    'kinyarwanda': 'rw',
 }
 
-# Initialize OpenAI client
-# Get API key from settings (which loads from .env)
-OPENAI_API_KEY = getattr(settings, 'OPENAI_API_KEY', '') or os.environ.get('OPENAI_API_KEY', '')
-print(f"DEBUG: OpenAI API Key found: {'Yes' if OPENAI_API_KEY else 'No'}")
-print(f"DEBUG: API Key length: {len(OPENAI_API_KEY) if OPENAI_API_KEY else 0}")
+# Paragraph batches sent in one translation request, and the marker line that
+# separates paragraphs inside a batch so translations can be split back out
+TRANSLATION_BATCH_CHARS = 8000
+SEGMENT_MARKER = re.compile(r'^@@(\d+)@@[ \t]*$', re.MULTILINE)
+
+# OpenAI client is created on first use (or by startup.preload() in the gunicorn
+# master) so importing this module stays cheap for pages that never translate.
+_client = None
+
+
+def get_client():
+    """Return the shared OpenAI client, creating it on first use."""
+    global _client
+    if _client is not None:
+        return _client
+
+    # Get API key from settings (which loads from .env)
+    api_key = getattr(settings, 'OPENAI_API_KEY', '') or os.environ.get('OPENAI_API_KEY', '')
+    print(f"DEBUG: OpenAI API Key found: {'Yes' if api_key else 'No'}")
+    if not api_key:
+        print("Warning: OPENAI_API_KEY is not set. Please add it to your .env file.")
+        return None
 
-client = None
-if OPENAI_API_KEY:
     try:
-        # Initialize OpenAI client with API key
+        from openai import OpenAI
         # Updated to work with OpenAI library v2.x
-        client = OpenAI(api_key=OPENAI_API_KEY)
+        _client = OpenAI(api_key=api_key)
         print("DEBUG: OpenAI client initialized successfully")
     except Exception as e:
         print(f"Warning: OpenAI client initialization failed: {e}")
         import traceback
         print(traceback.format_exc())
-        client = None
-else:
-    print("Warning: OPENAI_API_KEY is not set. Please add it to your .env file.")
+        _client = None
+    return _client
 
 
 def allowed_file(filename):
@@ -62,154 +76,158 @@ def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
-def extract_text_from_pdf(file_path):
-    """Extract text content from a PDF file."""
+def extract_text_from_pdf(file_path, source_language='english'):
+    """
+    Extract text content from a PDF file.
+
+    Pages without a text layer (phone scans) are sent through OCR when it is
+    available; all other pages use their embedded text. PyPDF2 runs in an
+    rlimited worker process (see guardrails.run_isolated).
+    """
     try:
-        text = ""
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-        return text.strip()
+        page_texts, scanned_pages = guardrails.run_isolated('extract', extraction.read_pdf_pages, file_path)
+
+        if scanned_pages and ocr.is_available():
+            for index, page_text in ocr.ocr_pages(file_path, scanned_pages, source_language).items():
+                page_texts[index] = page_text
+
+        return "\n".join(page_texts).strip()
+    except guardrails.BudgetExceeded:
+        raise
     except Exception as e:
         raise Exception(f"Error extracting text from PDF: {str(e)}")
 
 
 def extract_text_from_docx(file_path):
-    """Extract text content from a DOCX file."""
+    """Extract text content from a DOCX file (in an rlimited worker process)."""
     try:
-        doc = Document(file_path)
-        text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-        return text.strip()
+        return guardrails.run_isolated('extract', extraction.read_docx_text, file_path).strip()
+    except guardrails.BudgetExceeded:
+        raise
     except Exception as e:
         raise Exception(f"Error extracting text from DOCX: {str(e)}")
 
 
-def detect_language(text):
+def detect_language(text, deadline=None):
     """Detect the language of the given text using OpenAI."""
+    client = get_client()
     if not client:
         raise Exception("OpenAI client not initialized")
-        
-    prompt = f"""Detect the language of the following text. Respond with only one word from these options: English, French, Arabic, Swahili, Kinyarwanda.
-
-Text: {text[:500]}..."""
     
     try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a language detection expert. Respond with only the language name."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.1,
-            max_tokens=10
+        request = {
+            'model': prompts.DETECTION_MODEL,
+            'messages': prompts.build_detection_messages(text),
+            'temperature': 0.1,
+            'max_tokens': 10,
+        }
+        # Detection uses another model; keep it out of the translation latency history
+        result = hedging.complete(
+            client, request, len(prompts.detection_sample(text)), deadline=deadline, hedge=False, record=False
         )
         
-        detected_language = response.choices[0].message.content.strip().lower()
+        detected_language = result.text.strip().lower()
         return detected_language
+    except guardrails.BudgetExceeded:
+        raise
     except Exception as e:
         raise Exception(f"Error detecting language: {str(e)}")
 
 
-def translate_text(text, source_language, target_language):
-    """Translate text using OpenAI model."""
+def translate_text(text, source_language, target_language, glossary_terms=None, deadline=None):
+    """
+    Translate text using OpenAI model.
+
+    glossary_terms is a list of (term, translation) pairs the model must use.
+    Prompts come from the prompt registry (see prompts.py). deadline is the
+    time.monotonic() timestamp the job must finish by; slow requests may be
+    hedged (see hedging.py).
+    """
+    client = get_client()
     if not client:
         raise Exception("OpenAI client not initialized")
         
     if not text or not text.strip():
         raise Exception("No text to translate")
     
-    # Enhanced prompt for Kinyarwanda
-    if target_language.lower() == "kinyarwanda":
-        prompt = f"""You are an expert translator specializing in Kinyarwanda language.
-
-Translate the following text from {source_language} to Kinyarwanda.
-- Use proper Kinyarwanda grammar, vocabulary, and sentence structure.
-- Ensure natural, fluent Kinyarwanda that native speakers would use.
-- Maintain academic accuracy for educational content.
-- Use correct Kinyarwanda spelling and diacritics.
-- Only output the translated text, no explanations.
-
-Text to translate:
-{text}"""
-    else:
-        prompt = f"""You are a professional translator for educational documents.
-
-Translate the following text from {source_language} to {target_language}.
-- Keep the meaning exact and accurate with high precision.
-- Use clear and natural language suitable for students.
-- Maintain any academic or technical terms as precisely as possible.
-- Preserve formatting and structure.
-- Do not add explanations, only output the translated text.
-
-Text to translate:
-{text}"""
-    
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are a professional translator specializing in educational documents with high accuracy."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.1,
-            max_tokens=4000
-        )
+        request = {
+            'model': prompts.TRANSLATION_MODEL,
+            'messages': prompts.build_translation_messages(text, source_language, target_language, glossary_terms),
+            'temperature': 0.1,
+            'max_tokens': 4000,
+        }
+        result = hedging.complete(client, request, len(text), deadline=deadline)
         
-        translated_text = response.choices[0].message.content.strip()
+        usage = result.usage
+        if usage is not None:
+            cached = prompts.cached_tokens(usage)
+            metrics.increment('prompt_tokens', usage.prompt_tokens)
+            metrics.increment('cached_prompt_tokens', cached)
+            print(f"DEBUG: Translation usage ({prompts.PROMPT_VERSION}): "
+                  f"{usage.prompt_tokens} prompt tokens, {cached} cached")
+        
+        translated_text = result.text.strip()
         return translated_text
+    except guardrails.BudgetExceeded:
+        raise
     except Exception as e:
         raise Exception(f"Error during translation: {str(e)}")
 
 
+def translate_paragraphs(paragraphs, indexes, source_language, target_language, glossary=None, deadline=None):
+    """
+    Translate the paragraphs at the given indexes, batching them into as few
+    requests as possible. Returns the translations in the order of indexes.
+
+    If the model drops or mangles a marker, the batch is split in half and
+    retried so the translations always line up with their source paragraphs.
+    Only glossary terms that occur in a batch are added to its prompt.
+    """
+    def translate_batch(batch):
+        if len(batch) == 1:
+            text = paragraphs[batch[0]]
+            terms = glossary.find(text) if glossary else None
+            return [translate_text(text, source_language, target_language, glossary_terms=terms, deadline=deadline)]
+
+        text = "\n".join(f"@@{i}@@\n{paragraphs[i]}" for i in batch)
+        terms = glossary.find(text) if glossary else None
+        output = translate_text(text, source_language, target_language, glossary_terms=terms, deadline=deadline)
+        parts = SEGMENT_MARKER.split(output)
+        found = {int(parts[k]): parts[k + 1].strip() for k in range(1, len(parts) - 1, 2)}
+        if sorted(found) == sorted(batch) and all(found.values()):
+            return [found[i] for i in batch]
+
+        print(f"DEBUG: Segment markers lost in batch of {len(batch)}, splitting")
+        middle = len(batch) // 2
+        return translate_batch(batch[:middle]) + translate_batch(batch[middle:])
+
+    translations = []
+    batch = []
+    batch_chars = 0
+    for index in indexes:
+        if batch and batch_chars + len(paragraphs[index]) > TRANSLATION_BATCH_CHARS:
+            translations.extend(translate_batch(batch))
+            batch, batch_chars = [], 0
+        batch.append(index)
+        batch_chars += len(paragraphs[index])
+    if batch:
+        translations.extend(translate_batch(batch))
+    return translations
+
+
 def create_pdf_file(text, output_path, is_arabic=False):
-    """Create a PDF file with the translated text."""
+    """
+    Create a PDF file with the translated text.
+
+    text is either a string or an iterable of paragraphs; pages are written
+    out as they fill up (see pdfwriter.py) by an rlimited worker process.
+    """
     try:
-        doc = SimpleDocTemplate(output_path, pagesize=letter)
-        styles = getSampleStyleSheet()
-        story = []
-        
-        if is_arabic:
-            # Register Arabic font
-            try:
-                pdfmetrics.registerFont(TTFont('Arabic', 'arial.ttf'))
-                font_name = 'Arabic'
-            except:
-                try:
-                    pdfmetrics.registerFont(TTFont('Arabic', 'C:/Windows/Fonts/arial.ttf'))
-                    font_name = 'Arabic'
-                except:
-                    font_name = 'Helvetica'
-            
-            # Create RTL style for Arabic
-            arabic_style = ParagraphStyle(
-                'Arabic',
-                parent=styles['Normal'],
-                fontName=font_name,
-                fontSize=12,
-                alignment=TA_RIGHT,
-                wordWrap='RTL'
-            )
-            
-            # Process Arabic text
-            paragraphs = text.split('\n')
-            for para_text in paragraphs:
-                if para_text.strip():
-                    reshaped_text = reshape(para_text)
-                    bidi_text = get_display(reshaped_text)
-                    p = Paragraph(bidi_text, arabic_style)
-                    story.append(p)
-                    story.append(Spacer(1, 0.2*inch))
-        else:
-            # Standard text processing
-            paragraphs = text.split('\n')
-            for para_text in paragraphs:
-                if para_text.strip():
-                    p = Paragraph(para_text, styles['Normal'])
-                    story.append(p)
-                    story.append(Spacer(1, 0.2*inch))
-        
-        doc.build(story)
+        paragraphs = text.split('\n') if isinstance(text, str) else list(text)
+        guardrails.run_isolated('render', pdfwriter.write_pdf, paragraphs, output_path, is_arabic)
+    except guardrails.BudgetExceeded:
+        raise
     except Exception as e:
         raise Exception(f"Error creating PDF file: {str(e)}")
 
@@ -218,7 +236,15 @@ def create_pdf_file(text, output_path, is_arabic=False):
 def index(request):
     """Render the main upload form page."""
     try:
-        return render(request, 'translator/index.html', {'languages': LANGUAGES})
+        context = {
+            'languages': LANGUAGES,
+            'courses': Course.objects.all(),
+            'document_id': request.GET.get('document', ''),
+            # Edited versions default to the language pair of the earlier upload
+            'source_language': request.GET.get('source', ''),
+            'target_language': request.GET.get('target', ''),
+        }
+        return render(request, 'translator/index.html', context)
     except Exception as e:
         # Log the error for debugging
         import traceback
@@ -236,6 +262,12 @@ def translate(request):
     print(f"DEBUG: POST data: {request.POST}")
     print(f"DEBUG: FILES data: {request.FILES}")
     
+    # Uploads rejected while streaming (too large or wrong content) never reach FILES
+    upload_error = getattr(request, 'upload_errors', {}).get('file')
+    if upload_error:
+        messages.error(request, upload_error)
+        return redirect('translator:index')
+    
     # Check if file was uploaded
     if 'file' not in request.FILES:
         messages.error(request, 'No file selected. Please upload a document.')
@@ -244,6 +276,8 @@ def translate(request):
     file = request.FILES['file']
     source_language = request.POST.get('source_language', '').lower()
     target_language = request.POST.get('target_language', '').lower()
+    document_id = request.POST.get('document_id', '').strip()
+    course_id = request.POST.get('course', '').strip()
     
     # Validate file
     if file.name == '':
@@ -267,83 +301,112 @@ def translate(request):
         messages.error(request, 'Source and target languages cannot be the same.')
         return redirect('translator:index')
     
-    # Create uploads directory if it doesn't exist
-    os.makedirs(settings.UPLOAD_FOLDER, exist_ok=True)
-    os.makedirs(settings.TRANSLATIONS_FOLDER, exist_ok=True)
+    # A document id links this upload to an earlier revision of the same document
+    if document_id:
+        try:
+            document_id = str(uuid.UUID(document_id))
+        except ValueError:
+            messages.error(request, 'Invalid document ID.')
+            return redirect('translator:index')
+    
+    # Optional course whose glossary terms must be used
+    if course_id and not (course_id.isdigit() and Course.objects.filter(pk=course_id).exists()):
+        messages.error(request, 'Invalid course selected.')
+        return redirect('translator:index')
+    
+    # Every OpenAI call of this job must finish before the job deadline
+    deadline = time.monotonic() + settings.JOB_DEADLINE_SECONDS
     
-    file_path = None
+    upload_name = None
     try:
-        # Save uploaded file - sanitize filename for security
+        # Save uploaded file under a sanitised name unique to this upload
         original_filename = file.name
         safe_filename = get_valid_filename(original_filename)
-        file_path = os.path.join(settings.UPLOAD_FOLDER, safe_filename)
+        upload_storage = files.uploads_storage()
+        upload_name = upload_storage.save(files.unique_upload_name(original_filename), file)
         
-        # Ensure the path is within UPLOAD_FOLDER (prevent directory traversal)
-        file_path = os.path.abspath(file_path)
-        upload_folder = os.path.abspath(settings.UPLOAD_FOLDER)
-        if not file_path.startswith(upload_folder):
-            raise Exception("Invalid file path detected.")
-        with open(file_path, 'wb+') as destination:
-            for chunk in file.chunks():
-                destination.write(chunk)
+        # The upload handler hashed the file while it streamed in
+        content_hash = getattr(request, 'upload_digests', {}).get('file')
+        if not content_hash:
+            digest = hashlib.sha256()
+            with upload_storage.open(upload_name, 'rb') as uploaded:
+                for block in iter(lambda: uploaded.read(64 * 1024), b''):
+                    digest.update(block)
+            content_hash = digest.hexdigest()
         
         # Extract text based on file type
-        file_ext = safe_filename.rsplit('.', 1)[1].lower()
-        if file_ext == 'pdf':
-            extracted_text = extract_text_from_pdf(file_path)
-        elif file_ext == 'docx':
-            extracted_text = extract_text_from_docx(file_path)
-        else:
-            raise Exception("Unsupported file type")
+        # Each stage runs under its wall-clock/CPU/memory budget (JOB_BUDGETS)
+        with guardrails.stage('extract'), files.local_path(upload_storage, upload_name) as file_path:
+            file_ext = safe_filename.rsplit('.', 1)[1].lower()
+            if file_ext == 'pdf':
+                extracted_text = extract_text_from_pdf(file_path, source_language)
+            elif file_ext == 'docx':
+                extracted_text = extract_text_from_docx(file_path)
+            else:
+                raise Exception("Unsupported file type")
         
         # Check if text was extracted
         if not extracted_text or not extracted_text.strip():
             raise Exception("No text could be extracted from the document. The file may be empty or corrupted.")
         
         # Check if OpenAI client is initialized
-        if not client:
+        if not get_client():
             raise Exception("OpenAI API key is not configured. Please set OPENAI_API_KEY in your .env file or environment variables.")
         
-        # Detect document language and validate
-        detected_language = detect_language(extracted_text)
-        source_lang_name = LANGUAGES[source_language]
+        previous = revisions.latest_revision(document_id, source_language, target_language)
         
-        if detected_language != source_language and not detected_language.startswith(source_language[:3]):
-            raise Exception(f"Document language mismatch. Expected {source_lang_name}, but detected {detected_language.title()}. Please select the correct source language.")
+        # Detect, then translate, under the translate stage budget
+        with guardrails.stage('translate'):
+            # Detect document language and validate (already done for earlier revisions)
+            source_lang_name = LANGUAGES[source_language]
+            if previous is None:
+                detected_language = detect_language(extracted_text, deadline=deadline)
+                if detected_language != source_language and not detected_language.startswith(source_language[:3]):
+                    raise Exception(f"Document language mismatch. Expected {source_lang_name}, but detected {detected_language.title()}. Please select the correct source language.")
         
-        # Translate the text
-        source_lang_name = LANGUAGES[source_language]
-        target_lang_name = LANGUAGES[target_language]
-        translated_text = translate_text(extracted_text, source_lang_name, target_lang_name)
+            # Translate only paragraphs that are new or changed since the previous revision
+            target_lang_name = LANGUAGES[target_language]
+            paragraphs = revisions.split_paragraphs(extracted_text)
+            translations, changed = revisions.diff_paragraphs(paragraphs, previous)
+            print(f"DEBUG: Translating {len(changed)} of {len(paragraphs)} paragraphs")
+            if changed:
+                course_glossary = glossary.get_automaton(course_id, source_language, target_language)
+                # Identical concurrent uploads share a single OpenAI call
+                flight_key = singleflight.make_key(
+                    content_hash, source_language, target_language,
+                    previous.pk if previous is not None else '', course_id, prompts.PROMPT_VERSION
+                )
+                new_translations = singleflight.do(
+                    flight_key,
+                    lambda: translate_paragraphs(
+                        paragraphs, changed, source_lang_name, target_lang_name,
+                        glossary=course_glossary, deadline=deadline
+                    )
+                )
+                for index, translation in zip(changed, new_translations):
+                    translations[index] = translation
         
-        # Create output filename - sanitize base name to ensure safe filename
+        # File name the PDF is downloaded as - sanitize base name to ensure safe filename
         base_name = os.path.splitext(safe_filename)[0]
-        # Remove any potentially unsafe characters from base name
         safe_base_name = get_valid_filename(base_name)
         output_filename = f"{safe_base_name}_translated.pdf"
-        output_path = os.path.join(settings.TRANSLATIONS_FOLDER, output_filename)
-        
-        # Ensure output path is within TRANSLATIONS_FOLDER
-        output_path = os.path.abspath(output_path)
-        translations_folder = os.path.abspath(settings.TRANSLATIONS_FOLDER)
-        if not output_path.startswith(translations_folder):
-            raise Exception("Invalid output file path detected.")
         
-        # Create the translated PDF file
-        is_arabic = target_language == 'arabic'
-        create_pdf_file(translated_text, output_path, is_arabic=is_arabic)
+        # The PDF itself is only rendered when it is first downloaded
+        revision = revisions.save_revision(
+            document_id, source_language, target_language, paragraphs, translations,
+            output_filename=output_filename
+        )
         
         # Clean up uploaded file
-        if os.path.exists(file_path):
-            os.remove(file_path)
+        upload_storage.delete(upload_name)
         
-        # Redirect to success page with download link
-        return redirect('translator:success', filename=output_filename)
+        # Redirect to success page with the translation preview and download link
+        return redirect('translator:success', job_id=revision.job_id)
         
     except Exception as e:
         # Clean up on error
-        if file_path and os.path.exists(file_path):
-            os.remove(file_path)
+        if upload_name:
+            files.uploads_storage().delete(upload_name)
         
         # Log the full error for debugging
         import traceback
@@ -355,58 +418,66 @@ def translate(request):
         return redirect('translator:index')
 
 
+def _rendered_pdf_name(revision):
+    """Return the stored PDF for a revision, rendering it on first request."""
+    if revision.pdf:
+        return revision.pdf.name
+
+    def render_pdf():
+        # A concurrent download may have rendered it while we waited for the lock
+        revision.refresh_from_db(fields=['pdf'])
+        if not revision.pdf:
+            with tempfile.NamedTemporaryFile(suffix='.pdf') as output:
+                with guardrails.stage('render'):
+                    create_pdf_file(revision.translated_paragraphs, output.name, is_arabic=rtl.is_rtl(revision.target_language))
+                revision.pdf.save(f"{revision.job_id}.pdf", File(output), save=False)
+            revision.save(update_fields=['pdf'])
+            metrics.increment('pdf_renders')
+        return revision.pdf.name
+
+    # Several clicks on the same download link render the PDF only once
+    flight_key = singleflight.make_key(revision.job_id, revision.source_language, revision.target_language, 'pdf')
+    return singleflight.do(flight_key, render_pdf)
+
+
 @require_http_methods(["GET"])
-def success(request, filename):
-    """Render the success page with download link."""
-    if not filename:
-        messages.error(request, 'No file to download.')
-        return redirect('translator:index')
-    
-    # Sanitize filename for security
-    safe_filename = get_valid_filename(filename)
-    
-    # Verify the file actually exists
-    file_path = os.path.join(settings.TRANSLATIONS_FOLDER, safe_filename)
-    file_path = os.path.abspath(file_path)
-    translations_folder = os.path.abspath(settings.TRANSLATIONS_FOLDER)
-    
-    if not file_path.startswith(translations_folder):
-        messages.error(request, 'Invalid file path.')
+def success(request, job_id):
+    """Render the translated text as HTML with a link to download it as a PDF."""
+    revision = DocumentRevision.objects.filter(job_id=job_id).first()
+    if revision is None:
+        messages.error(request, 'Translation not found.')
         return redirect('translator:index')
     
-    if not os.path.exists(file_path):
-        messages.error(request, 'File not found.')
-        return redirect('translator:index')
-    
-    return render(request, 'translator/success.html', {'filename': safe_filename})
+    context = {
+        'job_id': revision.job_id,
+        'document_id': revision.document_id,
+        'source_language': revision.source_language,
+        'target_language': revision.target_language,
+        'filename': revision.output_filename or f"{revision.job_id}.pdf",
+        'paragraphs': [p for p in revision.translated_paragraphs if p.strip()],
+        'language_code': LANGUAGE_CODES.get(revision.target_language, ''),
+        'text_direction': 'rtl' if rtl.is_rtl(revision.target_language) else 'ltr',
+    }
+    return render(request, 'translator/success.html', context)
 
 
 @require_http_methods(["GET"])
-def download(request, filename):
-    """Download the translated document."""
+def download(request, job_id):
+    """Download the translated document, rendering the PDF if needed."""
+    revision = DocumentRevision.objects.filter(job_id=job_id).first()
+    if revision is None:
+        messages.error(request, 'File not found.')
+        return redirect('translator:index')
+    
     try:
-        # Sanitize filename to prevent directory traversal
-        safe_filename = get_valid_filename(filename)
-        file_path = os.path.join(settings.TRANSLATIONS_FOLDER, safe_filename)
-        
-        # Additional security check - ensure the resolved path is within TRANSLATIONS_FOLDER
-        file_path = os.path.abspath(file_path)
-        translations_folder = os.path.abspath(settings.TRANSLATIONS_FOLDER)
-        
-        if not file_path.startswith(translations_folder):
-            messages.error(request, 'Invalid file path.')
-            return redirect('translator:index')
-        
-        if not os.path.exists(file_path):
-            messages.error(request, 'File not found.')
-            return redirect('translator:index')
-        
-        return FileResponse(
-            open(file_path, 'rb'),
-            as_attachment=True,
-            filename=safe_filename
+        return files.download_response(
+            files.translations_storage(),
+            _rendered_pdf_name(revision),
+            revision.output_filename or f"{revision.job_id}.pdf"
         )
     except Exception as e:
+        import traceback
+        print(f"PDF rendering error: {str(e)}")
+        print(f"Full traceback:\n{traceback.format_exc()}")
         messages.error(request, f'Error downloading file: {str(e)}')
-        return redirect('translator:index')
-
+        return redirect('translator:success', job_id=revision.job_id)